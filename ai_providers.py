@@ -0,0 +1,434 @@
+"""
+AI 프로바이더 (Gemini → Groq → OpenAI)
+- 프로바이더별 호출 (캐시 / 스트리밍 / JSON 복구)
+- AUTO: 순서대로 시도 / HEDGE: 느리면 다음 프로바이더 동시 출발
+- main.py 의 generate 모드에서만 import (notify 모드는 안 읽음)
+"""
+import json
+import os
+import queue
+import threading
+import time
+
+import circuit_breaker
+import llm_cache
+import llm_json
+import llm_stream
+import post_templates
+import provider_stats
+import rate_limiter
+import token_accounting
+import tracing
+
+OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
+GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
+GROQ_API_KEY = os.environ.get('GROQ_API_KEY')
+
+# 헤지 모드: 앞 프로바이더가 느리면 다음 프로바이더를 동시에 출발
+AI_HEDGE = os.environ.get('AI_HEDGE', '0') == '1'
+AI_HEDGE_DELAY = os.environ.get('AI_HEDGE_DELAY')  # 비우면 최근 p95 사용
+AI_HEDGE_DEFAULT_DELAY = 30.0
+
+# 스트리밍 (1이면 조각 단위로 받으면서 title / tags 가 오는 즉시 후속 작업 시작)
+AI_STREAM = os.environ.get('AI_STREAM', '1') == '1'
+
+GEMINI_MODEL = "gemini-2.0-flash-exp"
+GROQ_MODEL = "llama-3.3-70b-versatile"
+OPENAI_MODEL = "gpt-4o-mini"
+
+
+def _parse_post(name, prompt, result_text, ask):
+    """
+    응답 JSON 검증 + 로컬 복구 (llm_json)
+    - 끊겼거나 필드가 빠졌으면 ask 로 그 부분만 한번 더 요청
+    - 고쳐서 쓸 수 있으면 성공 (다음 프로바이더로 안 넘어감)
+    """
+    result, report = llm_json.load_or_continue(result_text, post_templates.POST_SCHEMA, prompt, ask)
+    fixed = llm_json.describe(report)
+    if fixed:
+        print(f"  🩹 {name} JSON 복구: {fixed}")
+        provider_stats.STATS.record_repaired(name)
+    return result
+
+
+def _gemini_payload(prompt):
+    return {
+        "contents": [{"parts": [{"text": prompt}]}],
+        "generationConfig": {
+            "temperature": 0.9,
+            "maxOutputTokens": 8192,
+            "responseMimeType": "application/json"
+        }
+    }
+
+
+def _gemini_request(prompt):
+    """스트리밍 없이 1번 호출 → 응답 텍스트"""
+    url = f"https://generativelanguage.googleapis.com/v1beta/models/{GEMINI_MODEL}:generateContent?key={GEMINI_API_KEY}"
+    response = rate_limiter.post('gemini', url, prompt, retries=0, json=_gemini_payload(prompt), timeout=120)
+    response.raise_for_status()
+    return response.json()['candidates'][0]['content']['parts'][0]['text']
+
+
+@tracing.traced()
+def call_gemini(prompt, on_field=None):
+    if not GEMINI_API_KEY:
+        return None
+    
+    try:
+        print("  🟢 Gemini 시도...")
+        data = _gemini_payload(prompt)
+        
+        result_text = llm_cache.get('gemini', GEMINI_MODEL, prompt, data['generationConfig'])
+        from_cache = result_text is not None
+        tracing.annotate(cached=from_cache)
+        
+        if from_cache:
+            llm_stream.replay(result_text, on_field)
+        elif AI_STREAM:
+            stream_url = f"https://generativelanguage.googleapis.com/v1beta/models/{GEMINI_MODEL}:streamGenerateContent?alt=sse&key={GEMINI_API_KEY}"
+            result_text = llm_stream.stream_json('gemini', stream_url, prompt, data, on_field=on_field)
+        else:
+            result_text = _gemini_request(prompt)
+            llm_stream.replay(result_text, on_field)
+        
+        result = _parse_post('gemini', prompt, result_text, _gemini_request)
+        if not from_cache and not llm_stream.cancelled():
+            llm_cache.put('gemini', GEMINI_MODEL, prompt, data['generationConfig'], json.dumps(result, ensure_ascii=False))
+        
+        print("  ✅ Gemini 성공!")
+        return result
+        
+    except llm_stream.StreamCancelled:
+        print("  🛑 Gemini 취소 (다른 프로바이더 승리)")
+        tracing.annotate(cancelled=True)
+        return None
+        
+    except Exception as e:
+        print(f"  ⚠️ Gemini 실패: {str(e)[:100]}")
+        tracing.annotate(error=str(e)[:100])
+        return None
+
+
+def _groq_payload(prompt):
+    return {
+        "model": GROQ_MODEL,
+        "messages": [
+            {"role": "system", "content": "편의점 블로거. JSON으로만 답해."},
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": 0.9,
+        "response_format": {"type": "json_object"}
+    }
+
+
+def _groq_headers():
+    return {"Authorization": f"Bearer {GROQ_API_KEY}", "Content-Type": "application/json"}
+
+
+def _groq_request(prompt):
+    """스트리밍 없이 1번 호출 → 응답 텍스트"""
+    response = rate_limiter.post('groq', "https://api.groq.com/openai/v1/chat/completions", prompt, retries=0,
+                                 headers=_groq_headers(), json=_groq_payload(prompt), timeout=120)
+    response.raise_for_status()
+    return response.json()['choices'][0]['message']['content']
+
+
+@tracing.traced()
+def call_groq(prompt, on_field=None):
+    if not GROQ_API_KEY:
+        return None
+    
+    try:
+        print("  🔵 Groq 시도...")
+        data = _groq_payload(prompt)
+        
+        result_text = llm_cache.get('groq', GROQ_MODEL, prompt, data)
+        from_cache = result_text is not None
+        tracing.annotate(cached=from_cache)
+        
+        if from_cache:
+            llm_stream.replay(result_text, on_field)
+        elif AI_STREAM:
+            result_text = llm_stream.stream_json('groq', "https://api.groq.com/openai/v1/chat/completions", prompt,
+                                                 {**data, "stream": True}, on_field=on_field, headers=_groq_headers())
+        else:
+            result_text = _groq_request(prompt)
+            llm_stream.replay(result_text, on_field)
+        
+        result = _parse_post('groq', prompt, result_text, _groq_request)
+        if not from_cache and not llm_stream.cancelled():
+            llm_cache.put('groq', GROQ_MODEL, prompt, data, json.dumps(result, ensure_ascii=False))
+        
+        print("  ✅ Groq 성공!")
+        return result
+        
+    except llm_stream.StreamCancelled:
+        print("  🛑 Groq 취소 (다른 프로바이더 승리)")
+        tracing.annotate(cancelled=True)
+        return None
+        
+    except Exception as e:
+        print(f"  ⚠️ Groq 실패: {str(e)[:100]}")
+        tracing.annotate(error=str(e)[:100])
+        return None
+
+
+def _openai_payload(prompt):
+    return {
+        "model": OPENAI_MODEL,
+        "messages": [
+            {"role": "system", "content": "편의점 블로거"},
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": 0.9,
+        "response_format": {"type": "json_object"}
+    }
+
+
+def _openai_headers():
+    return {"Authorization": f"Bearer {OPENAI_API_KEY}", "Content-Type": "application/json"}
+
+
+def _openai_request(prompt):
+    """스트리밍 없이 1번 호출 → 응답 텍스트"""
+    response = rate_limiter.post('openai', "https://api.openai.com/v1/chat/completions", prompt,
+                                 retries=0, headers=_openai_headers(), json=_openai_payload(prompt), timeout=120)
+    if response.status_code == 429:
+        raise RuntimeError("OpenAI Rate Limit!")
+    response.raise_for_status()
+    return response.json()['choices'][0]['message']['content']
+
+
+@tracing.traced()
+def call_openai(prompt, on_field=None):
+    if not OPENAI_API_KEY:
+        return None
+    
+    try:
+        print("  🟠 OpenAI 시도...")
+        data = _openai_payload(prompt)
+        
+        result_text = llm_cache.get('openai', OPENAI_MODEL, prompt, data)
+        from_cache = result_text is not None
+        tracing.annotate(cached=from_cache)
+        
+        if from_cache:
+            llm_stream.replay(result_text, on_field)
+        elif AI_STREAM:
+            stream_data = {**data, "stream": True, "stream_options": {"include_usage": True}}
+            result_text = llm_stream.stream_json('openai', "https://api.openai.com/v1/chat/completions", prompt,
+                                                 stream_data, on_field=on_field, headers=_openai_headers())
+        else:
+            result_text = _openai_request(prompt)
+            llm_stream.replay(result_text, on_field)
+        
+        result = _parse_post('openai', prompt, result_text, _openai_request)
+        if not from_cache and not llm_stream.cancelled():
+            llm_cache.put('openai', OPENAI_MODEL, prompt, data, json.dumps(result, ensure_ascii=False))
+        
+        print("  ✅ OpenAI 성공!")
+        return result
+        
+    except llm_stream.StreamCancelled:
+        print("  🛑 OpenAI 취소 (다른 프로바이더 승리)")
+        tracing.annotate(cancelled=True)
+        return None
+        
+    except Exception as e:
+        print(f"  ⚠️ OpenAI 실패: {str(e)[:100]}")
+        tracing.annotate(error=str(e)[:100])
+        return None
+
+
+def _available_providers():
+    """API 키가 있고 브레이커가 열려있지 않은 프로바이더만 우선순위대로"""
+    providers = [
+        ('gemini', call_gemini, GEMINI_API_KEY),
+        ('groq', call_groq, GROQ_API_KEY),
+        ('openai', call_openai, OPENAI_API_KEY),
+    ]
+    available = []
+    for name, func, key in providers:
+        if not key:
+            continue
+        if not circuit_breaker.BREAKER.is_available(name):
+            print(f"  ⛔ {name} 브레이커 open → 건너뜀")
+            continue
+        available.append((name, func))
+    return available
+
+
+def _timed_call(name, func, prompt, on_field=None):
+    """프로바이더 호출 + 지연시간/성공 여부 기록 (브레이커가 막으면 호출 안 함)"""
+    if not circuit_breaker.BREAKER.allow(name):
+        print(f"  ⛔ {name} 브레이커 open → 건너뜀")
+        return None
+    
+    started = time.monotonic()
+    result = func(prompt, on_field)
+    latency = time.monotonic() - started
+    if llm_stream.cancelled():
+        # 헤지에서 진 호출: 중간에 끊었으니 지연시간 / 성공 여부 기록 안 함
+        circuit_breaker.BREAKER.cancel(name)
+        return result
+    provider_stats.STATS.record(name, latency, bool(result))
+    circuit_breaker.BREAKER.record(name, latency, bool(result))
+    return result
+
+
+def _hedge_delay(name):
+    """다음 프로바이더를 병렬로 출발시킬 시점 (고정값 > 학습된 p95 > 기본값)"""
+    if AI_HEDGE_DELAY:
+        return float(AI_HEDGE_DELAY)
+    p95 = provider_stats.STATS.p95(name)
+    return p95 if p95 is not None else AI_HEDGE_DEFAULT_DELAY
+
+
+def generate_with_hedge(prompt, on_field=None):
+    """
+    헤지 모드: 앞 프로바이더가 지연 기준을 넘기면 다음 프로바이더를 동시에 출발
+    - 먼저 유효한 JSON 을 준 쪽이 승리
+    - 진 쪽은 취소: 스트리밍은 다음 조각에서 응답을 닫고 끝냄 (비스트리밍은 응답이 와야 끝남)
+      → 캐시 / 브레이커 / 성적표 기록 없이 결과 버림 (토큰은 받은 만큼 취소로 기록)
+    - 실패하면 기다리지 않고 바로 다음 프로바이더 출발
+    """
+    providers = _available_providers()
+    print(f"  🏁 HEDGE 모드: {' → '.join(name for name, _ in providers)}")
+    if not providers:
+        print("  ❌ 모든 AI 실패!")
+        return None
+    
+    finished = queue.Queue()
+    done = threading.Event()
+    store = token_accounting.current_store()
+    
+    def run(name, func):
+        with token_accounting.store(store), llm_stream.cancel_on(done):
+            result = _timed_call(name, func, prompt, on_field)
+        if done.is_set():
+            provider_stats.STATS.record_cancelled(name)
+            return
+        finished.put((name, result))
+    
+    def launch(index):
+        name, func = providers[index]
+        threading.Thread(target=tracing.bind(run), args=(name, func), daemon=True).start()
+        return time.monotonic()
+    
+    last_launch = launch(0)
+    next_index = 1
+    pending = 1
+    
+    while pending:
+        timeout = None
+        if next_index < len(providers):
+            delay = _hedge_delay(providers[next_index - 1][0])
+            timeout = max(0.0, delay - (time.monotonic() - last_launch))
+        
+        try:
+            name, result = finished.get(timeout=timeout)
+        except queue.Empty:
+            print(f"  ⏩ {providers[next_index - 1][0]} 응답 지연 → {providers[next_index][0]} 동시 출발")
+            last_launch = launch(next_index)
+            next_index += 1
+            pending += 1
+            continue
+        
+        pending -= 1
+        if result:
+            done.set()
+            provider_stats.STATS.record_win(name)
+            print(f"  🏆 {name} 승리!")
+            return result
+        
+        # 실패 → 다음 프로바이더 바로 출발
+        if next_index < len(providers) and pending == 0:
+            last_launch = launch(next_index)
+            next_index += 1
+            pending += 1
+    
+    print("  ❌ 모든 AI 실패!")
+    return None
+
+
+def generate_with_auto(prompt, on_field=None):
+    """on_field: 스트리밍으로 응답 JSON 의 필드(title / tags / products ...)가 완성될 때마다 호출 (llm_stream 참고)"""
+    if AI_HEDGE:
+        return generate_with_hedge(prompt, on_field)
+    
+    print("  🤖 AUTO 모드: Gemini → Groq → OpenAI")
+    
+    for name, func in _available_providers():
+        result = _timed_call(name, func, prompt, on_field)
+        if result:
+            provider_stats.STATS.record_win(name)
+            return result
+    
+    print("  ❌ 모든 AI 실패!")
+    return None
+
+
+# =========================
+# 콘텐츠 생성
+# =========================
+def generate_blog_post(store_info, on_field=None):
+    try:
+        name = store_info['name']
+        country = store_info['country']
+        
+        print(f"  📝 {name} {'🇯🇵' if country == 'jp' else '🇰🇷'} 블로그 글 생성 중...")
+        
+        # 본문 HTML 은 post_templates 가 만들고, AI 는 제품 필드만 JSON 으로
+        if country == 'kr':
+            prompt = f"""당신은 편의점 블로거입니다. {name} 신상 제품 2개를 소개하세요.
+
+요구사항:
+- 제목: 클릭하고 싶은 제목 (이모지 포함)
+- 인사말: 1-2문장
+- 각 제품: 제품명, 가격(원), 맛 후기, 꿀조합, 별점, 일본어 요약
+- 친근한 MZ 말투
+- HTML 없이 텍스트만
+
+JSON 형식:
+{{"title": "제목", "tags": ["편의점신상", "{name}", "꿀조합"], "greeting": "인사말", "products": [{post_templates.KR_PRODUCT_FIELDS}]}}
+"""
+        else:
+            prompt = f"""당신은 일본 편의점 블로거입니다. {name} 신상 제품 2개를 소개하세요.
+
+요구사항:
+- 제목: 클릭하고 싶은 제목 (한일 병기)
+- 인사말: 1-2문장
+- 각 제품: 제품명(한일), 가격(엔), 리뷰, 일본 문화 팁, 별점
+- HTML 없이 텍스트만
+
+JSON 형식:
+{{"title": "제목", "tags": ["일본편의점", "{name}"], "greeting": "인사말", "products": [{post_templates.JP_PRODUCT_FIELDS}]}}
+"""
+        
+        if token_accounting.LEDGER.exhausted():
+            print("  ⛔ 토큰 예산 소진 → 생성 건너뜀")
+            return None
+        
+        print(f"  🧮 프롬프트 약 {token_accounting.estimate_tokens(prompt)} 토큰")
+        with token_accounting.store(store_info['key']), tracing.span('generate', store=store_info['key']):
+            result = generate_with_auto(prompt, on_field)
+        
+        if not result:
+            return None
+        
+        result['content'] = post_templates.render_post(store_info, result)
+        if not result['content']:
+            print("  ❌ 제품 정보가 없어서 본문을 만들 수 없음")
+            return None
+        
+        result['category'] = store_info['category']
+        result['country'] = country
+        result['store_key'] = store_info['key']
+        
+        print(f"  ✅ 생성 완료: {result['title'][:30]}...")
+        return result
+        
+    except Exception as e:
+        print(f"  ❌ 실패: {e}")
+        return None
@@ -0,0 +1,105 @@
+"""
+딥 크롤링 벤치마크 (로컬 가짜 서버)
+- 편의점 3곳 x 카테고리 x 페이지로 이루어진 사이트를 로컬에 띄움 (페이지마다 인위적 지연)
+- 동시성 설정별 pages/sec 와 최대 RSS 측정
+
+사용법:
+    python benchmarks/bench_deep_crawl.py
+"""
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('CACHE_DIR', tempfile.mkdtemp(prefix='bench_deep_crawl_'))
+
+from deep_crawl import DeepCrawler
+
+STORES = ['gs25', 'cu', 'seven']
+CATEGORIES = 5
+PAGES_PER_CATEGORY = 10
+ITEMS_PER_PAGE = 40
+LATENCY = 0.02  # 페이지당 서버 지연 (초)
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """/{store}/ → 카테고리 링크, /{store}/{category}/{page} → 제품 목록 + 다음 페이지"""
+
+    def do_GET(self):
+        time.sleep(LATENCY)
+        parts = [p for p in self.path.split('/') if p]
+        if len(parts) == 1:
+            links = "".join(f'<a class="cat" href="/{parts[0]}/{c}/1">카테고리 {c}</a>' for c in range(CATEGORIES))
+            body = f"<html><body><nav>{links}</nav></body></html>"
+        else:
+            store, category, page = parts[0], int(parts[1]), int(parts[2])
+            items = "".join(
+                f'<li><img src="/img/{store}/{category}/{page}/{i}.jpg"><p class="name">{store} 제품 {category}-{page}-{i}</p>'
+                f'<p class="price">{1000 + i * 100}원</p></li>'
+                for i in range(ITEMS_PER_PAGE)
+            )
+            nxt = f'<a class="next" href="/{store}/{category}/{page + 1}">다음</a>' if page < PAGES_PER_CATEGORY else ''
+            body = f'<html><body><ul class="prod_list">{items}</ul>{nxt}</body></html>'
+
+        data = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def fixture_specs(base_url):
+    return {
+        store: {
+            'name': store,
+            'urls': [f"{base_url}/{store}/"],
+            'scope': 'prod_list',
+            'item': '.prod_list li',
+            'fields': {'name': '.name', 'price': '.price', 'image': 'img@src'},
+            'default_price': '0',
+            'next': 'a.next@href',
+            'follow': 'a.cat@href',
+            'max_pages': 1 + CATEGORIES * PAGES_PER_CATEGORY,
+        }
+        for store in STORES
+    }
+
+
+def peak_rss_mb():
+    # 리눅스: KB, macOS: bytes
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 / 1024 if sys.platform == 'darwin' else rss / 1024
+
+
+def main():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    specs = fixture_specs(base_url)
+
+    expected_pages = len(STORES) * (1 + CATEGORIES * PAGES_PER_CATEGORY)
+    print(f"🧪 딥 크롤링 벤치마크: {expected_pages}페이지, 페이지당 지연 {LATENCY * 1000:.0f}ms")
+    print("-" * 60)
+
+    for concurrency, per_host in [(1, 1), (4, 4), (8, 8), (16, 16)]:
+        out_path = os.path.join(tempfile.gettempdir(), f"bench_deep_crawl_{concurrency}.jsonl")
+        crawler = DeepCrawler(specs, concurrency=concurrency, per_host=per_host)
+        stats = crawler.run(out_path)
+        print(f"동시 {concurrency:2d} (호스트당 {per_host:2d}): {stats['pages']}페이지 / 제품 {stats['products']}개 / "
+              f"{stats['pages_per_sec']:6.1f} pages/sec / 최대 RSS {peak_rss_mb():.0f}MB")
+        os.remove(out_path)
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
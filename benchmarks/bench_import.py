@@ -0,0 +1,92 @@
+"""
+main.py import 시간 벤치마크 (python -X importtime)
+- 모드별로 실제로 읽는 모듈만 import 해서 누적 시간 측정 (매번 새 프로세스)
+- notify 모드에서 읽으면 안 되는 무거운 모듈(wordpress_xmlrpc, PIL ...)이 섞였는지도 확인
+
+사용법:
+    python benchmarks/bench_import.py              # 모드별 중앙값
+    python benchmarks/bench_import.py --top 15     # 모드별로 오래 걸린 모듈도 출력
+"""
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 모드별로 실행하는 코드 (main() 과 같은 순서로 import)
+# - notify: send_notification() 이 import 하는 것 (알림 시간이 아니면 전송은 안 함)
+# - generate: generate_and_schedule() 이 import 하는 것 (실제 생성 / 발행은 안 함)
+MODES = {
+    'import': "import main",
+    'notify': "import main; import slack_notify",
+    'generate': (
+        "import main; import concurrent.futures; "
+        "import ai_providers, circuit_breaker, provider_stats, publish_ledger, slack_notify, token_accounting, wordpress; "
+        "import wp_publisher, wp_images"
+    ),
+}
+
+# notify 모드에서 import 되면 안 되는 모듈
+NOTIFY_FORBIDDEN = ('wordpress_xmlrpc', 'PIL', 'ai_providers', 'rate_limiter', 'sqlite3')
+
+ROUNDS = 7
+
+_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def measure(code, startup=()):
+    """
+    새 프로세스에서 -X importtime → (누적 us, {모듈: 누적 us})
+    startup: 인터프리터 시작 때 이미 읽는 모듈 (site 등) → 합계에서 뺌
+    """
+    env = {**os.environ, 'MODE': 'notify'}
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr[-500:])
+
+    total = 0
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        _, cum, indent, name = match.groups()
+        if name in startup:
+            continue
+        cumulative[name] = int(cum)
+        if len(indent) == 1:  # 최상위 import
+            total += int(cum)
+    return total, cumulative
+
+
+def main():
+    top = 0
+    if '--top' in sys.argv:
+        top = int(sys.argv[sys.argv.index('--top') + 1])
+
+    _, startup = measure('pass')
+
+    print(f"{'모드':<10} {'중앙값':>10} {'최소':>10}")
+    for mode, code in MODES.items():
+        runs = [measure(code, startup) for _ in range(ROUNDS)]
+        totals = [total for total, _ in runs]
+        print(f"{mode:<10} {statistics.median(totals) / 1000:>8.1f}ms {min(totals) / 1000:>8.1f}ms")
+
+        modules = runs[-1][1]
+        if mode == 'notify':
+            leaked = [name for name in NOTIFY_FORBIDDEN if name in modules]
+            if leaked:
+                print(f"  ⚠️ notify 모드에서 import 됨: {', '.join(leaked)}")
+
+        if top:
+            for name, cum in sorted(modules.items(), key=lambda item: -item[1])[:top]:
+                print(f"    {cum / 1000:>7.1f}ms  {name}")
+
+
+if __name__ == '__main__':
+    main()
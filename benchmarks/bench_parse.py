@@ -0,0 +1,129 @@
+"""
+크롤러 파싱 속도 벤치마크
+- 예전 방식: html.parser 로 전체 파싱 + 필드마다 select_one 2번
+- 지금 방식: lxml + SoupStrainer 로 제품 목록만 파싱 + 컴파일된 셀렉터 1번씩
+
+사용법:
+    python benchmarks/bench_parse.py            # fixtures/ 의 HTML 로 측정
+    python benchmarks/bench_parse.py --fetch    # 실제 페이지를 fixtures/ 에 저장 후 측정
+
+fixtures/ 에 파일이 없으면 실제 페이지 크기와 비슷한 가짜 페이지를 만들어서 씀
+"""
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+from bs4 import BeautifulSoup
+
+from config import STORE_SPECS
+from crawler import get_spec, HTML_PARSER
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# 벤치마크 대상 (fixture 파일 이름 → store key)
+TARGETS = {
+    'gs25': 'GS25',
+    'cu': 'CU',
+    'seven': '세븐일레븐_한국',
+}
+
+ROUNDS = 20
+
+
+def legacy_fields(spec):
+    """'img@src' 같은 스펙 셀렉터를 예전 코드가 쓰던 셀렉터로"""
+    return {field: selector.partition('@')[0] for field, selector in spec['fields'].items()}
+
+
+def synthetic_page(scope_class, item_selector, fields, n_items=40, noise_blocks=300):
+    """헤더/메뉴/스크립트가 잔뜩 붙은 실제 페이지 비슷한 HTML"""
+    name_class = fields['name'].lstrip('.')
+    price_class = fields['price'].lstrip('.')
+    noise = "".join(
+        f'<div class="nav-item"><a href="/menu/{i}">메뉴 {i}</a><span class="desc">설명 텍스트 {i}</span></div>'
+        for i in range(noise_blocks)
+    )
+    script = "<script>" + "var x=1;" * 2000 + "</script>"
+
+    if item_selector.startswith('.') and ' ' not in item_selector:
+        items = "".join(
+            f'<div class="{scope_class}"><img src="/img/{i}.jpg"><p class="{name_class}">제품 {i}</p>'
+            f'<p class="{price_class}">{1000 + i * 100}원</p></div>'
+            for i in range(n_items)
+        )
+    else:
+        items = f'<ul class="{scope_class}">' + "".join(
+            f'<li><img src="/img/{i}.jpg"><p class="{name_class}">제품 {i}</p>'
+            f'<p class="{price_class}">{1000 + i * 100}원</p></li>'
+            for i in range(n_items)
+        ) + '</ul>'
+
+    return f"<html><head>{script}</head><body>{noise}<main>{items}</main>{noise}</body></html>"
+
+
+def legacy_parse(html, item_selector, fields, default_price, limit=3):
+    """예전 crawl_* 파싱 그대로"""
+    soup = BeautifulSoup(html, 'html.parser')
+    products = []
+    for item in soup.select(item_selector)[:limit]:
+        try:
+            name = item.select_one(fields['name']).text.strip() if item.select_one(fields['name']) else None
+            price = item.select_one(fields['price']).text.strip() if item.select_one(fields['price']) else None
+            img = item.select_one(fields['image'])['src'] if item.select_one(fields['image']) else None
+            if name:
+                price_num = re.sub(r'[^\d]', '', price) if price else default_price
+                products.append({'name': name, 'price': f"{price_num}원", 'image': img})
+        except Exception:
+            continue
+    return products
+
+
+def load_fixture(store, fetch=False):
+    spec = STORE_SPECS[TARGETS[store]]
+    url = spec['urls'][0]
+    path = os.path.join(FIXTURES_DIR, f"{store}.html")
+
+    if fetch:
+        os.makedirs(FIXTURES_DIR, exist_ok=True)
+        response = requests.get(url, timeout=10, headers={'User-Agent': 'Mozilla/5.0'})
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(response.text)
+
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            return f.read(), 'fixture'
+    return synthetic_page(spec['scope'], spec['item'], legacy_fields(spec)), 'synthetic'
+
+
+def bench(func, rounds=ROUNDS):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        result = func()
+    return (time.perf_counter() - started) / rounds * 1000, result
+
+
+def main():
+    fetch = '--fetch' in sys.argv
+    print(f"🧪 파싱 벤치마크 (파서: {HTML_PARSER}, {ROUNDS}회 평균)")
+    print("-" * 60)
+
+    for store, key in TARGETS.items():
+        html, source = load_fixture(store, fetch)
+        spec = STORE_SPECS[key]
+        compiled = get_spec(key)
+
+        old_ms, old_result = bench(lambda: legacy_parse(html, spec['item'], legacy_fields(spec), spec['default_price'], spec['limit']))
+        new_ms, new_result = bench(lambda: compiled.extract(html))
+
+        same = "✅ 결과 동일" if old_result == new_result else "⚠️ 결과 다름"
+        speedup = old_ms / new_ms if new_ms else 0
+        print(f"{store:6s} ({source}, {len(html) // 1024}KB): "
+              f"예전 {old_ms:7.2f}ms → 지금 {new_ms:7.2f}ms ({speedup:.1f}배) {same}")
+
+
+if __name__ == "__main__":
+    main()
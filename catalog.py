@@ -0,0 +1,102 @@
+"""
+제품 카탈로그 (SQLite)
+- 크롤링할 때마다 (편의점, 정규화한 이름, 가격) 기준으로 upsert
+- 아직 리뷰 안 한 제품만 골라서 AI 에 넘김 → 같은 제품 반복 리뷰 방지
+- 리뷰 글 생성에 성공하면 mark_reviewed() 로 표시
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+from config import CACHE_DIR
+
+DB_PATH = os.path.join(CACHE_DIR, 'catalog.sqlite')
+
+_NON_WORD = re.compile(r'[\W_]+')
+
+
+def normalize_name(name):
+    """전각/반각, 대소문자, 공백, 기호 차이 무시"""
+    return _NON_WORD.sub('', unicodedata.normalize('NFKC', name or '').lower())
+
+
+class ProductCatalog:
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS products (
+                store TEXT,
+                norm_name TEXT,
+                price TEXT,
+                name TEXT,
+                name_jp TEXT,
+                image TEXT,
+                first_seen REAL,
+                last_seen REAL,
+                reviewed_at REAL,
+                PRIMARY KEY (store, norm_name, price)
+            )
+        """)
+        self.db.commit()
+
+    def sync(self, store, products):
+        """
+        크롤링 결과 upsert → 아직 리뷰 안 한 제품 리스트 리턴 (크롤링 순서 유지)
+        """
+        now = time.time()
+        fresh = []
+        new_count = 0
+
+        with self.lock:
+            for product in products:
+                key = (store, normalize_name(product['name']), product.get('price'))
+                row = self.db.execute(
+                    "SELECT reviewed_at FROM products WHERE store = ? AND norm_name = ? AND price = ?", key
+                ).fetchone()
+
+                if row is None:
+                    new_count += 1
+                    self.db.execute(
+                        "INSERT INTO products VALUES (?, ?, ?, ?, ?, ?, ?, ?, NULL)",
+                        key + (product['name'], product.get('name_jp'), product.get('image'), now, now),
+                    )
+                    fresh.append(product)
+                else:
+                    self.db.execute(
+                        "UPDATE products SET last_seen = ?, image = COALESCE(?, image) "
+                        "WHERE store = ? AND norm_name = ? AND price = ?",
+                        (now, product.get('image')) + key,
+                    )
+                    if row[0] is None:
+                        fresh.append(product)
+            self.db.commit()
+
+        print(f"  📚 카탈로그: {len(products)}개 중 신규 {new_count}개, 리뷰 안 한 제품 {len(fresh)}개")
+        return fresh
+
+    def mark_reviewed(self, store, products):
+        now = time.time()
+        with self.lock:
+            for product in products:
+                self.db.execute(
+                    "UPDATE products SET reviewed_at = ? WHERE store = ? AND norm_name = ? AND price = ?",
+                    (now, store, normalize_name(product['name']), product.get('price')),
+                )
+            self.db.commit()
+
+    def counts(self, store=None):
+        """전체 / 리뷰 완료 제품 수"""
+        query = "SELECT COUNT(*), COUNT(reviewed_at) FROM products"
+        args = ()
+        if store:
+            query += " WHERE store = ?"
+            args = (store,)
+        with self.lock:
+            total, reviewed = self.db.execute(query, args).fetchone()
+        return {'total': total, 'reviewed': reviewed}
@@ -0,0 +1,153 @@
+"""
+AI 프로바이더 서킷 브레이커 + 상태판
+- closed: 정상 호출
+- open: 연속 실패 N번 → 쿨다운 동안 아예 건너뜀
+- half_open: 쿨다운 끝나면 1번만 찔러보고 성공하면 closed, 실패하면 다시 open
+- 상태는 .cache/breaker_state.json 에 저장해서 다음 크론 실행도 이어받음
+"""
+import json
+import os
+import threading
+import time
+
+from config import CACHE_DIR, BREAKER_FAILURE_THRESHOLD, BREAKER_COOLDOWN_SECONDS, BREAKER_SLOW_SECONDS
+
+STATE_PATH = os.path.join(CACHE_DIR, 'breaker_state.json')
+
+# 지연시간 지수이동평균 가중치
+LATENCY_ALPHA = 0.3
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    def __init__(self, path=STATE_PATH,
+                 threshold=BREAKER_FAILURE_THRESHOLD,
+                 cooldown=BREAKER_COOLDOWN_SECONDS,
+                 slow_seconds=BREAKER_SLOW_SECONDS):
+        self.path = path
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.slow_seconds = slow_seconds
+        self.lock = threading.Lock()
+        self.probing = set()  # half_open 에서 지금 찔러보는 중인 프로바이더
+        self.state = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"  ⚠️ 브레이커 상태 파일 읽기 실패 (초기화): {e}")
+            return {}
+
+    def _save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.state, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"  ⚠️ 브레이커 상태 저장 실패: {e}")
+
+    def _entry(self, provider):
+        if provider not in self.state:
+            self.state[provider] = {
+                'state': CLOSED,
+                'failures': 0,
+                'opened_at': None,
+                'latency_ewma': None,
+                'total_ok': 0,
+                'total_failed': 0,
+            }
+        return self.state[provider]
+
+    def _cooled_down(self, entry):
+        return time.time() - (entry['opened_at'] or 0) >= self.cooldown
+
+    def is_available(self, provider):
+        """상태를 바꾸지 않고 지금 호출해볼 만한지만 확인"""
+        with self.lock:
+            entry = self._entry(provider)
+            if entry['state'] == CLOSED:
+                return True
+            if provider in self.probing:
+                return False
+            return entry['state'] == HALF_OPEN or self._cooled_down(entry)
+
+    def allow(self, provider):
+        """호출 직전 확인 (쿨다운 끝난 open 은 half_open 으로 바꾸고 1번만 허용)"""
+        with self.lock:
+            entry = self._entry(provider)
+            if entry['state'] == CLOSED:
+                return True
+            if provider in self.probing:
+                return False
+            if entry['state'] == OPEN and not self._cooled_down(entry):
+                return False
+            entry['state'] = HALF_OPEN
+            self.probing.add(provider)
+            print(f"  🔌 {provider} 브레이커 half-open → 복구 확인 호출")
+            return True
+
+    def _update_latency(self, entry, latency):
+        if entry['latency_ewma'] is None:
+            entry['latency_ewma'] = latency
+        else:
+            entry['latency_ewma'] = LATENCY_ALPHA * latency + (1 - LATENCY_ALPHA) * entry['latency_ewma']
+
+    def record(self, provider, latency, ok):
+        """호출 결과 반영 (너무 느린 성공도 실패로 셈)"""
+        if ok and latency >= self.slow_seconds:
+            print(f"  🐢 {provider} 응답 {latency:.0f}초 → 느린 호출로 실패 처리")
+            ok = False
+
+        with self.lock:
+            entry = self._entry(provider)
+            self._update_latency(entry, latency)
+            self.probing.discard(provider)
+
+            if ok:
+                if entry['state'] != CLOSED:
+                    print(f"  ✅ {provider} 브레이커 closed (복구됨)")
+                entry['state'] = CLOSED
+                entry['failures'] = 0
+                entry['opened_at'] = None
+                entry['total_ok'] += 1
+            else:
+                entry['failures'] += 1
+                entry['total_failed'] += 1
+                if entry['state'] == HALF_OPEN or entry['failures'] >= self.threshold:
+                    entry['state'] = OPEN
+                    entry['opened_at'] = time.time()
+                    print(f"  ⛔ {provider} 브레이커 open → {self.cooldown / 60:.0f}분 동안 건너뜀")
+
+            self._save()
+
+    def cancel(self, provider):
+        """결과를 버린 호출 (헤지에서 짐) → 상태는 그대로, half_open 확인 호출만 다시 허용"""
+        with self.lock:
+            self.probing.discard(provider)
+
+    def print_scoreboard(self):
+        with self.lock:
+            if not self.state:
+                return
+            print("🩺 AI 프로바이더 상태판:")
+            for name, entry in self.state.items():
+                latency = f"{entry['latency_ewma']:.1f}s" if entry['latency_ewma'] is not None else '-'
+                remaining = ''
+                if entry['state'] == OPEN:
+                    left = self.cooldown - (time.time() - (entry['opened_at'] or 0))
+                    remaining = f" (재시도까지 {max(0, left) / 60:.0f}분)"
+                print(f"   - {name}: {entry['state']}{remaining} / 연속 실패 {entry['failures']} / "
+                      f"누적 성공 {entry['total_ok']} / 누적 실패 {entry['total_failed']} / 평균 지연 {latency}")
+
+
+# 프로세스 전체에서 공유
+BREAKER = CircuitBreaker()
@@ -9,6 +9,23 @@ WORDPRESS_URL = os.environ.get('WORDPRESS_URL')  # 예: https://yourblog.com
 WORDPRESS_USERNAME = os.environ.get('WORDPRESS_USERNAME')
 WORDPRESS_PASSWORD = os.environ.get('WORDPRESS_PASSWORD')
 
+# 캐시/상태 파일 폴더 (GitHub Actions 에서는 actions/cache 로 유지)
+CACHE_DIR = os.environ.get('CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache'))
+
+# LLM 응답 캐시 (같은 프롬프트 재실행 시 API 호출 생략)
+LLM_CACHE_DISABLE = os.environ.get('LLM_CACHE_DISABLE', '0') == '1'
+LLM_CACHE_TTL_HOURS = float(os.environ.get('LLM_CACHE_TTL_HOURS', 12))
+LLM_CACHE_MAX_MB = float(os.environ.get('LLM_CACHE_MAX_MB', 50))
+
+# 서킷 브레이커 (연속 실패한 AI 프로바이더는 잠시 건너뜀)
+BREAKER_FAILURE_THRESHOLD = int(os.environ.get('BREAKER_FAILURE_THRESHOLD', 3))
+BREAKER_COOLDOWN_SECONDS = float(os.environ.get('BREAKER_COOLDOWN_SECONDS', 1800))
+BREAKER_SLOW_SECONDS = float(os.environ.get('BREAKER_SLOW_SECONDS', 90))
+
+# 블로그 이미지 최적화 (표시 폭 기준 1x/2x, 이미지 1장당 최대 용량)
+IMAGE_DISPLAY_WIDTH = int(os.environ.get('IMAGE_DISPLAY_WIDTH', 360))
+IMAGE_MAX_BYTES = int(os.environ.get('IMAGE_MAX_BYTES', 100 * 1024))
+
 # 크롤링 대상 URL들
 CRAWL_URLS = {
     'GS25': 'https://gs25.gsretail.com/gscvs/ko/products/youus-freshfood',
@@ -16,6 +33,90 @@ CRAWL_URLS = {
     'SEVENELEVEN': 'https://www.7-eleven.co.kr/product/presentList.asp'
 }
 
+# 편의점별 크롤링 스펙 (crawler.py 의 공통 엔진이 그대로 실행)
+# - urls: 여러 개 넣으면 (카테고리 페이지 등) 전부 동시에 크롤링 후 합침
+# - scope: 제품 목록을 감싸는 요소의 class (이 안쪽만 파싱)
+# - item: 제품 1개 셀렉터 / fields: 필드별 셀렉터 ('셀렉터@속성' 이면 속성값)
+# - price_regex: 가격 텍스트에서 숫자 뽑는 정규식 (첫 번째 그룹)
+# - default_price: 가격 못 찾았을 때 / limit: 최대 제품 수
+# - next / follow: 딥 크롤링(deep_crawl.py) 때 따라갈 다음 페이지 / 카테고리 링크 ('a셀렉터@href')
+#   (실제 구조에 맞게 조정 필요) / max_pages: 편의점당 최대 페이지 수
+STORE_SPECS = {
+    'GS25': {
+        'name': 'GS25',
+        'urls': [CRAWL_URLS['GS25']],
+        'scope': 'prod_box',
+        'item': '.prod_box',
+        'fields': {'name': '.tit', 'price': '.price', 'image': 'img@src'},
+        'price_regex': r'(\d[\d,]*)',
+        'default_price': '2500',
+        'limit': 30,
+        'next': 'a.next@href',
+        'max_pages': 50,
+    },
+    'CU': {
+        'name': 'CU',
+        'urls': [CRAWL_URLS['CU']],
+        'scope': 'prod_list',
+        'item': '.prod_list li',
+        'fields': {'name': '.name', 'price': '.price', 'image': 'img@src'},
+        'price_regex': r'(\d[\d,]*)',
+        'default_price': '3000',
+        'limit': 30,
+        'next': 'a.next@href',
+        'max_pages': 50,
+    },
+    '세븐일레븐_한국': {
+        'name': '세븐일레븐',
+        'urls': [CRAWL_URLS['SEVENELEVEN']],
+        'scope': 'item_list',
+        'item': '.item_list li',
+        'fields': {'name': '.name', 'price': '.price', 'image': 'img@src'},
+        'price_regex': r'(\d[\d,]*)',
+        'default_price': '2800',
+        'limit': 30,
+        'next': 'a.next@href',
+        'max_pages': 50,
+    },
+}
+
+# 카탈로그: 리뷰 안 한 제품만 AI 에 넘김 (0 이면 매번 크롤링 결과 그대로)
+CATALOG_DELTA = os.environ.get('CATALOG_DELTA', '1') == '1'
+PRODUCTS_PER_POST = int(os.environ.get('PRODUCTS_PER_POST', 3))
+
 # 블로그 설정
 POSTS_PER_DAY = 2  # 하루에 발행할 워드프레스 글 개수
 INSTAGRAM_POSTS_PER_DAY = 2  # 하루에 준비할 인스타 콘텐츠 개수
+
+# AI 프로바이더별 속도 제한 (분당 요청 수 / 분당 토큰 수)
+# 환경변수로 덮어쓰기 가능: GEMINI_RPM, GEMINI_TPM, GROQ_RPM ...
+RATE_LIMITS = {
+    'gemini': {
+        'rpm': int(os.environ.get('GEMINI_RPM', 10)),
+        'tpm': int(os.environ.get('GEMINI_TPM', 1000000)),
+    },
+    'groq': {
+        'rpm': int(os.environ.get('GROQ_RPM', 30)),
+        'tpm': int(os.environ.get('GROQ_TPM', 12000)),
+    },
+    'openai': {
+        'rpm': int(os.environ.get('OPENAI_RPM', 500)),
+        'tpm': int(os.environ.get('OPENAI_TPM', 200000)),
+    },
+}
+
+# 실행 1번에 쓸 수 있는 AI 토큰 (입력+출력, 0 이면 제한 없음)
+TOKEN_BUDGET = int(os.environ.get('TOKEN_BUDGET', 200000))
+
+# 구간별 시간 기록 (tracing.py, 실행마다 JSON Lines 1개 / 워크플로우에서 아티팩트로 보관)
+TRACE_DIR = os.environ.get('TRACE_DIR', os.path.join(CACHE_DIR, 'traces'))
+
+# 토큰 리포트 저장 위치 (실행마다 JSON 1개, 구간별 시간 기록과 같은 곳 → 같이 아티팩트로 보관)
+TOKEN_REPORT_DIR = os.environ.get('TOKEN_REPORT_DIR', TRACE_DIR)
+
+# 모델별 가격 (USD / 100만 토큰, 입력 / 출력) - 비용 리포트용 대략치
+TOKEN_PRICES = {
+    'gemini-2.0-flash-exp': {'input': 0.10, 'output': 0.40},
+    'llama-3.3-70b-versatile': {'input': 0.59, 'output': 0.79},
+    'gpt-4o-mini': {'input': 0.15, 'output': 0.60},
+}
@@ -0,0 +1,190 @@
+"""
+🟣 Couchmallow 이미지 + 워터마크
+- assets/ 폴더에 올려둔 PNG 중에서 랜덤으로 1개 뽑아서 씁니다.
+- 없으면 None 리턴해서 기존 로직이 그냥 자기 방식대로 가도록.
+- 워터마크는 "복제금지 / couchmallow" 로 아주 연하게 찍음.
+- 워터마크 결과는 (원본 해시, 문구, 투명도, 폰트) 로 캐시 → 이미 있으면 그 파일 그대로 사용
+- 미리 다 만들어두기: python couchmallow.py (웹용 WebP/PNG 변환본까지)
+"""
+import functools
+import hashlib
+import os
+import random
+
+import image_optimizer
+import tracing
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+    _PIL_AVAILABLE = True
+except Exception:
+    _PIL_AVAILABLE = False
+
+
+# 1) 에셋 폴더 & 파일 목록 정의
+COUCHMALLOW_ASSETS_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "assets"
+)
+COUCHMALLOW_OUT_DIR = os.path.join(COUCHMALLOW_ASSETS_DIR, "_out")
+
+# 공주님이 올릴 파일들 이름만 여기 추가해가면 됨
+COUCHMALLOW_CANDIDATES = [
+    "Couchmallow_AM_01_360_ivory.png",
+    "Couchmallow_AM_04_360_ivory.png",
+    "Couchmallow_AM_07_360_ivory.png",
+]
+
+WATERMARK_TEXT = "Do not copy/ couchmallow"
+WATERMARK_OPACITY = 60
+WATERMARK_FONT = "arial.ttf"
+
+
+# 2) 랜덤으로 1개 뽑기
+def pick_couchmallow_image() -> str | None:
+    """assets/ 안에 실제로 존재하는 파일만 모아서 랜덤으로 1개 리턴"""
+    available = []
+    for name in COUCHMALLOW_CANDIDATES:
+        path = os.path.join(COUCHMALLOW_ASSETS_DIR, name)
+        if os.path.exists(path):
+            available.append(path)
+    if not available:
+        return None
+    return random.choice(available)
+
+
+# 3) 워터마크 캐시 키
+_hash_memo = {}
+
+
+def _source_hash(path: str) -> str:
+    """원본 파일 sha256 (mtime/size 가 그대로면 다시 안 읽음)"""
+    st = os.stat(path)
+    memo_key = (path, st.st_mtime_ns, st.st_size)
+    if memo_key not in _hash_memo:
+        with open(path, 'rb') as f:
+            _hash_memo[memo_key] = hashlib.sha256(f.read()).hexdigest()
+    return _hash_memo[memo_key]
+
+
+def _font_size(height: int) -> int:
+    return max(10, int(height * 0.035))
+
+
+@functools.lru_cache(maxsize=None)
+def _load_font(size: int):
+    """폰트는 크기별로 프로세스당 1번만 로드 → (폰트, 캐시 키에 넣을 이름)"""
+    try:
+        # 시스템에 폰트 있으면 이걸로
+        return ImageFont.truetype(WATERMARK_FONT, size), f"{WATERMARK_FONT}@{size}"
+    except Exception:
+        # 폰트: 깃허브 액션/리눅스에서도 돌아가게 기본 폰트로
+        return ImageFont.load_default(), "default"
+
+
+def watermark_cache_key(input_path: str, text: str, opacity: int, font_id: str) -> str:
+    raw = "|".join([_source_hash(input_path), text, str(opacity), font_id])
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:16]
+
+
+# 4) 워터마크 찍기
+@tracing.traced()
+def add_watermark(input_path: str,
+                  text: str = WATERMARK_TEXT,
+                  opacity: int = WATERMARK_OPACITY) -> str:
+    """
+    input_path 이미지를 열어서 오른쪽 아래에 연한 워터마크를 찍고
+    ./assets/_out/ 안에 새 파일로 저장한 뒤 그 경로를 리턴.
+    같은 조건으로 이미 만든 파일이 있으면 다시 그리지 않고 그 경로 리턴.
+    Pillow가 없으면 원본 경로 그대로 리턴.
+    """
+    if not _PIL_AVAILABLE:
+        # PIL 없으면 그냥 원본 사용
+        return input_path
+
+    with Image.open(input_path) as src:
+        w, h = src.size
+    font, font_id = _load_font(_font_size(h))
+
+    # 파일 이름 만들기 (캐시 키 포함)
+    name_wo_ext, _ = os.path.splitext(os.path.basename(input_path))
+    key = watermark_cache_key(input_path, text, opacity, font_id)
+    out_path = os.path.join(COUCHMALLOW_OUT_DIR, f"{name_wo_ext}_wm_{key}.png")
+
+    if os.path.exists(out_path):
+        return out_path
+
+    # 출력 폴더
+    os.makedirs(COUCHMALLOW_OUT_DIR, exist_ok=True)
+
+    base = Image.open(input_path).convert("RGBA")
+
+    # 워터마크 레이어
+    txt_layer = Image.new("RGBA", base.size, (255, 255, 255, 0))
+    draw = ImageDraw.Draw(txt_layer)
+
+    left, top, right, bottom = draw.textbbox((0, 0), text, font=font)
+    text_w, text_h = right - left, bottom - top
+
+    # 오른쪽 아래 살짝 띄워서
+    margin = int(min(w, h) * 0.03)
+    x = w - text_w - margin
+    y = h - text_h - margin
+
+    # 연보라(공주님 톤) + 투명
+    watermark_color = (94, 73, 133, opacity)  # RGBA
+
+    draw.text((x, y), text, font=font, fill=watermark_color)
+
+    # 합치기
+    out = Image.alpha_composite(base, txt_layer)
+
+    # 동시에 같은 파일 만들더라도 반쯤 쓴 파일이 보이지 않게
+    tmp_path = f"{out_path}.{os.getpid()}.tmp"
+    out.convert("RGB").save(tmp_path, "PNG")
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+# 5) 최종: 블로그 포스트에 쓸 이미지 하나 만들어서 경로 리턴
+def get_couchmallow_image_for_post() -> str | None:
+    """
+    1) assets/ 에서 랜덤 선택
+    2) 워터마크 찍기 (캐시에 있으면 그대로)
+    3) 워드프레스 업로드용 로컬 경로 리턴
+    """
+    src = pick_couchmallow_image()
+    if not src:
+        return None
+    return add_watermark(src)
+
+
+# 6) 빌드 단계: 후보 이미지 전부 미리 워터마크
+def prerender_all() -> list[str]:
+    """COUCHMALLOW_CANDIDATES 전부 워터마크 + 웹용 변환본 미리 생성 (이미 있으면 건너뜀)"""
+    outputs = []
+    for name in COUCHMALLOW_CANDIDATES:
+        path = os.path.join(COUCHMALLOW_ASSETS_DIR, name)
+        if not os.path.exists(path):
+            print(f"⚠️ 없음: {name}")
+            continue
+        out_path = add_watermark(path)
+        print(f"✅ {name} → {os.path.relpath(out_path, COUCHMALLOW_ASSETS_DIR)}")
+        outputs.append(out_path)
+
+        optimized = image_optimizer.optimize_for_web(out_path)
+        if optimized:
+            for variant in optimized['variants']:
+                print(f"   - {variant['format']} {variant['width']}w: {variant['bytes'] // 1024}KB")
+            report = image_optimizer.bytes_report(optimized)
+            print(f"   💾 {report['original_bytes'] // 1024}KB → {report['served_bytes'] // 1024}KB "
+                  f"({report['saved_pct']:.0f}% 절감)")
+    return outputs
+
+
+if __name__ == "__main__":
+    if os.environ.get("TEST_COUCHMALLOW") == "1":
+        print("generated:", get_couchmallow_image_for_post())
+    else:
+        print("🖼️ Couchmallow 워터마크 미리 생성")
+        prerender_all()
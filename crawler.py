@@ -1,145 +1,293 @@
 """
 편의점 신상 제품 크롤링
 실제 웹사이트에서 제품 정보 수집
+- 편의점별 URL/셀렉터는 config.STORE_SPECS 에 선언
+- 스펙은 1번만 컴파일해서 공통 엔진(fetch → extract)으로 실행
 """
 import requests
-from bs4 import BeautifulSoup
-import json
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup, SoupStrainer
+import soupsieve
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 import time
 import re
+from urllib.parse import urljoin, urldefrag
+
+from config import STORE_SPECS
+from http_cache import HttpCache
+import tracing
+
+# lxml 이 훨씬 빠름 (없으면 내장 파서)
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# 일본 편의점은 크롤링 대상이 없어서 더미 데이터 (store key → 이름)
+JAPAN_STORES = {
+    '세븐일레븐_일본': '세븐일레븐',
+    '패밀리마트': '패밀리마트',
+    '로손': '로손',
+}
+
+
+@lru_cache(maxsize=None)
+def compile_selector(selector):
+    """CSS 셀렉터는 1번만 컴파일"""
+    return soupsieve.compile(selector)
+
+
+class ExtractionSpec:
+    """config.STORE_SPECS 항목 1개를 컴파일한 것"""
+    
+    def __init__(self, key, spec):
+        self.key = key
+        self.name = spec.get('name', key)
+        self.urls = list(spec['urls'])
+        self.scope = SoupStrainer(class_=spec['scope'])
+        self.item = compile_selector(spec['item'])
+        self.price_regex = re.compile(spec.get('price_regex', r'(\d[\d,]*)'))
+        self.default_price = spec.get('default_price')
+        self.limit = spec.get('limit', 3)
+        
+        # 'img@src' → (img 셀렉터, src 속성)
+        self.fields = {}
+        for field, selector in spec['fields'].items():
+            self.fields[field] = self._compile_field(selector)
+        
+        # 딥 크롤링용 링크 (다음 페이지 / 카테고리)
+        self.link_selectors = [
+            self._compile_field(spec[name])
+            for name in ('next', 'follow') if spec.get(name)
+        ]
+        self.max_pages = spec.get('max_pages', 1)
+    
+    @staticmethod
+    def _compile_field(selector):
+        selector, _, attr = selector.partition('@')
+        return compile_selector(selector), attr or None
+    
+    def _field(self, item, field):
+        if field not in self.fields:
+            return None
+        selector, attr = self.fields[field]
+        el = selector.select_one(item)
+        if not el:
+            return None
+        return el.get(attr) if attr else el.get_text().strip()
+    
+    def _price(self, text):
+        """가격 텍스트에서 숫자만 (못 찾으면 기본 가격)"""
+        match = self.price_regex.search(text) if text else None
+        if not match:
+            return self.default_price
+        return (match.group(1) if match.groups() else match.group(0)).replace(',', '')
+    
+    def extract(self, html, limit=None):
+        """
+        제품 목록 HTML 파싱
+        - scope 요소(제품 목록) 아래만 파싱 (SoupStrainer)
+        - 필드마다 select_one 1번씩만
+        - limit=0 이면 페이지의 제품 전부
+        """
+        soup = BeautifulSoup(html, HTML_PARSER, parse_only=self.scope)
+        
+        products = []
+        for item in self.item.select(soup, limit=self.limit if limit is None else limit):
+            try:
+                name = self._field(item, 'name')
+                if not name:
+                    continue
+                
+                product = {
+                    'name': name,
+                    'price': f"{self._price(self._field(item, 'price'))}원",
+                    'image': self._field(item, 'image'),
+                }
+                # 스펙에 추가 필드가 있으면 같이 수집
+                for field in self.fields:
+                    if field not in ('name', 'price', 'image'):
+                        product[field] = self._field(item, field)
+                products.append(product)
+            except Exception:
+                continue
+        
+        return products
+
+
+    def links(self, html, base_url):
+        """
+        다음 페이지 / 카테고리 링크 (절대 URL, #fragment 제거)
+        - <a> 태그만 파싱하므로 next / follow 셀렉터는 a 요소 자체를 가리켜야 함
+        """
+        if not self.link_selectors:
+            return []
+        
+        soup = BeautifulSoup(html, HTML_PARSER, parse_only=SoupStrainer('a'))
+        urls = []
+        for selector, attr in self.link_selectors:
+            for el in selector.select(soup):
+                href = el.get(attr or 'href')
+                if href and not href.startswith(('javascript:', 'mailto:')):
+                    urls.append(urldefrag(urljoin(base_url, href))[0])
+        return urls
+
+
+@lru_cache(maxsize=None)
+def get_spec(key):
+    """store key → 컴파일된 스펙 (프로세스당 1번)"""
+    return ExtractionSpec(key, STORE_SPECS[key])
 
 
 class ConvenienceStoreCrawler:
     """편의점 크롤링 클래스"""
     
-    def __init__(self):
+    def __init__(self, max_workers=6, pool_size=10):
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
+        self.max_workers = max_workers
+        self.session = self._build_session(pool_size)
+        self.http = HttpCache(self.session)
+        self.last_timings = {}
     
-    def crawl_gs25(self):
-        """GS25 신상 제품 크롤링"""
-        try:
-            print("🔍 GS25 크롤링 중...")
-            url = "https://gs25.gsretail.com/gscvs/ko/products/youus-freshfood"
-            
-            response = requests.get(url, headers=self.headers, timeout=10)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            products = []
-            
-            # 제품 목록 찾기 (실제 구조에 맞게 조정 필요)
-            items = soup.select('.prod_box')[:3]  # 상위 3개
+    def _build_session(self, pool_size):
+        """keep-alive 공유 세션 (호스트당 커넥션 풀 크기 제한)"""
+        session = requests.Session()
+        session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+    
+    def store_keys(self):
+        """크롤링 스펙 편의점 + 일본 편의점 (더미)"""
+        return list(STORE_SPECS) + list(JAPAN_STORES)
+    
+    @tracing.traced()
+    def crawl_all(self, store_keys=None):
+        """
+        모든 편의점(의 모든 페이지)을 동시에 크롤링
+        - store key → 제품 리스트 dict 리턴 (store_keys 순서 유지)
+        - 편의점별 소요 시간은 self.last_timings 에 저장
+        """
+        keys = [key for key in self.store_keys() if not store_keys or key in store_keys]
+        if not keys:
+            return {}
+        
+        # (store key, url) 페이지 단위로 쪼개서 한 풀에서 실행
+        jobs = []
+        for key in keys:
+            if key in STORE_SPECS:
+                jobs.extend((key, url) for url in get_spec(key).urls)
+            else:
+                jobs.append((key, None))
+        
+        print(f"🚀 {len(keys)}개 편의점 ({len(jobs)}페이지) 동시 크롤링 시작...")
+        
+        pages = {key: [] for key in keys}
+        errors = {key: [] for key in keys}
+        timings = {key: 0.0 for key in keys}
+        page_times = []
+        started = time.perf_counter()
+        
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(jobs))) as pool:
+            futures = {pool.submit(tracing.bind(self._timed), self._crawl_job, key, url): (key, url) for key, url in jobs}
             
-            for item in items:
+            for future in as_completed(futures):
+                key, url = futures[future]
                 try:
-                    name = item.select_one('.tit').text.strip() if item.select_one('.tit') else None
-                    price = item.select_one('.price').text.strip() if item.select_one('.price') else None
-                    img = item.select_one('img')['src'] if item.select_one('img') else None
-                    
-                    if name:
-                        # 가격에서 숫자만 추출
-                        price_num = re.sub(r'[^\d]', '', price) if price else "2500"
-                        
-                        products.append({
-                            'name': name,
-                            'price': f"{price_num}원",
-                            'image': img
-                        })
-                except:
-                    continue
-            
-            # 크롤링 실패 시 더미 데이터
-            if not products:
-                products = self._get_dummy_gs25()
-            
-            print(f"✅ GS25: {len(products)}개 제품 수집")
-            return products[:3]
-            
-        except Exception as e:
-            print(f"⚠️ GS25 크롤링 실패: {e}")
-            return self._get_dummy_gs25()
+                    products, elapsed = future.result()
+                    pages[key].append(products)
+                except Exception as e:
+                    errors[key].append(e)
+                    elapsed = 0.0
+                timings[key] = max(timings[key], elapsed)
+                page_times.append(elapsed)
+        
+        results = {key: self._finish_store(key, pages[key], errors[key]) for key in keys}
+        
+        total = time.perf_counter() - started
+        serial_sum = sum(page_times)
+        self.last_timings = {'stores': timings, 'total': total, 'serial_sum': serial_sum}
+        
+        print("⏱️ 편의점별 크롤링 시간:")
+        for key in keys:
+            print(f"   - {key}: {timings[key]:.2f}초")
+        speedup = serial_sum / total if total > 0 else 1.0
+        print(f"⏱️ 전체 {total:.2f}초 (순차 실행 시 {serial_sum:.2f}초, {speedup:.1f}배)")
+        print(self.http.summary_line())
+        
+        return results
+    
+    def _timed(self, func, *args):
+        """크롤링 함수 실행 + 소요 시간 측정"""
+        started = time.perf_counter()
+        products = func(*args)
+        return products, time.perf_counter() - started
+    
+    def _crawl_job(self, key, url):
+        if url is None:
+            return self.crawl_japan_store(JAPAN_STORES[key])
+        return self.fetch_and_extract(key, url)
+    
+    def fetch_and_extract(self, key, url):
+        """페이지 1개 다운로드 (조건부 GET 캐시) + 스펙대로 제품 추출 (실패 시 예외)"""
+        print(f"🔍 {key} 크롤링 중... {url}")
+        with tracing.span('crawl_page', store=key, url=url):
+            html = self.http.get_text(url, timeout=10)
+            return get_spec(key).extract(html)
+    
+    def _finish_store(self, key, pages, errors):
+        """페이지별 결과 합치기 (이름 중복 제거, limit) → 비었으면 더미"""
+        if key not in STORE_SPECS:
+            return pages[0] if pages else []
+        
+        spec = get_spec(key)
+        products = []
+        seen = set()
+        for page in pages:
+            for product in page:
+                if product['name'] not in seen:
+                    seen.add(product['name'])
+                    products.append(product)
+        
+        for e in errors:
+            print(f"⚠️ {key} 크롤링 실패: {e}")
+        
+        # 크롤링 실패 시 더미 데이터
+        if not products:
+            products = self.dummy_products(key)
+        
+        print(f"✅ {spec.name}: {len(products[:spec.limit])}개 제품 수집")
+        return products[:spec.limit]
+    
+    def crawl_store(self, key):
+        """스펙 편의점 1곳 크롤링 (여러 페이지면 순서대로)"""
+        with tracing.span('crawl_store', store=key):
+            pages, errors = [], []
+            for url in get_spec(key).urls:
+                try:
+                    pages.append(self.fetch_and_extract(key, url))
+                except Exception as e:
+                    errors.append(e)
+            return self._finish_store(key, pages, errors)
+    
+    def crawl_gs25(self):
+        """GS25 신상 제품 크롤링"""
+        return self.crawl_store('GS25')
     
     def crawl_cu(self):
         """CU 신상 제품 크롤링"""
-        try:
-            print("🔍 CU 크롤링 중...")
-            url = "https://cu.bgfretail.com/product/product.do?category=product&depth=1&sf=N"
-            
-            response = requests.get(url, headers=self.headers, timeout=10)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            products = []
-            
-            # 제품 목록 찾기
-            items = soup.select('.prod_list li')[:3]
-            
-            for item in items:
-                try:
-                    name = item.select_one('.name').text.strip() if item.select_one('.name') else None
-                    price = item.select_one('.price').text.strip() if item.select_one('.price') else None
-                    img = item.select_one('img')['src'] if item.select_one('img') else None
-                    
-                    if name:
-                        price_num = re.sub(r'[^\d]', '', price) if price else "3000"
-                        
-                        products.append({
-                            'name': name,
-                            'price': f"{price_num}원",
-                            'image': img
-                        })
-                except:
-                    continue
-            
-            if not products:
-                products = self._get_dummy_cu()
-            
-            print(f"✅ CU: {len(products)}개 제품 수집")
-            return products[:3]
-            
-        except Exception as e:
-            print(f"⚠️ CU 크롤링 실패: {e}")
-            return self._get_dummy_cu()
+        return self.crawl_store('CU')
     
     def crawl_seven_eleven_kr(self):
         """세븐일레븐(한국) 신상 제품 크롤링"""
-        try:
-            print("🔍 세븐일레븐 크롤링 중...")
-            url = "https://www.7-eleven.co.kr/product/presentList.asp"
-            
-            response = requests.get(url, headers=self.headers, timeout=10)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            products = []
-            items = soup.select('.item_list li')[:3]
-            
-            for item in items:
-                try:
-                    name = item.select_one('.name').text.strip() if item.select_one('.name') else None
-                    price = item.select_one('.price').text.strip() if item.select_one('.price') else None
-                    img = item.select_one('img')['src'] if item.select_one('img') else None
-                    
-                    if name:
-                        price_num = re.sub(r'[^\d]', '', price) if price else "2800"
-                        
-                        products.append({
-                            'name': name,
-                            'price': f"{price_num}원",
-                            'image': img
-                        })
-                except:
-                    continue
-            
-            if not products:
-                products = self._get_dummy_seven_kr()
-            
-            print(f"✅ 세븐일레븐: {len(products)}개 제품 수집")
-            return products[:3]
-            
-        except Exception as e:
-            print(f"⚠️ 세븐일레븐 크롤링 실패: {e}")
-            return self._get_dummy_seven_kr()
+        return self.crawl_store('세븐일레븐_한국')
     
+    @tracing.traced()
     def crawl_japan_store(self, store_name):
         """일본 편의점 (더미 데이터 - API 또는 별도 크롤링 필요)"""
         print(f"🔍 {store_name} 데이터 생성 중...")
@@ -157,6 +305,15 @@ class ConvenienceStoreCrawler:
     # 더미 데이터 (크롤링 실패 시 대체)
     # ========================================
     
+    def dummy_products(self, key):
+        """store key → 더미 데이터"""
+        dummies = {
+            'GS25': self._get_dummy_gs25,
+            'CU': self._get_dummy_cu,
+            '세븐일레븐_한국': self._get_dummy_seven_kr,
+        }
+        return dummies[key]() if key in dummies else []
+    
     def _get_dummy_gs25(self):
         """GS25 더미 데이터"""
         return [
@@ -216,29 +373,14 @@ if __name__ == "__main__":
     print("🕷️ 편의점 크롤링 테스트")
     print("=" * 60)
     
-    # GS25
-    gs25_products = crawler.crawl_gs25()
-    print(f"\n📦 GS25 제품:")
-    for p in gs25_products:
-        print(f"  - {p['name']} ({p['price']})")
-    
-    # CU
-    cu_products = crawler.crawl_cu()
-    print(f"\n📦 CU 제품:")
-    for p in cu_products:
-        print(f"  - {p['name']} ({p['price']})")
-    
-    # 세븐일레븐
-    seven_products = crawler.crawl_seven_eleven_kr()
-    print(f"\n📦 세븐일레븐 제품:")
-    for p in seven_products:
-        print(f"  - {p['name']} ({p['price']})")
-    
-    # 일본 편의점
-    seven_jp = crawler.crawl_japan_store('세븐일레븐')
-    print(f"\n📦 세븐일레븐(일본) 제품:")
-    for p in seven_jp:
-        print(f"  - {p['name']} ({p['price']})")
+    # 전체 동시 크롤링 (편의점마다 1번씩만 요청)
+    all_products = crawler.crawl_all()
+    print(f"\n📦 동시 크롤링 결과: {', '.join(f'{k} {len(v)}개' for k, v in all_products.items())}")
+    
+    for key, products in all_products.items():
+        print(f"\n📦 {key} 제품:")
+        for p in products:
+            print(f"  - {p['name']} ({p['price']})")
     
     print("\n" + "=" * 60)
     print("✅ 크롤링 테스트 완료!")
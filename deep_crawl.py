@@ -0,0 +1,148 @@
+"""
+편의점 전체 카탈로그 딥 크롤링
+- config.STORE_SPECS 의 시작 URL 부터 next / follow 링크를 따라감
+- asyncio 프론티어: 전체 동시 요청 수 + 호스트별 동시 요청 수 제한, URL 중복 제거
+- 편의점당 max_pages, 프론티어 최대 크기로 메모리 상한
+- 결과는 메모리에 모으지 않고 JSONL 로 바로바로 기록
+
+사용법:
+    python deep_crawl.py                          # 전체 편의점
+    python deep_crawl.py --stores GS25,CU --out /tmp/catalog.jsonl --max-pages 20
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import defaultdict
+from datetime import datetime
+from urllib.parse import urlsplit
+
+from config import STORE_SPECS
+from crawler import ConvenienceStoreCrawler, ExtractionSpec
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_PER_HOST = 4
+
+# 프론티어(대기 중 URL)가 이보다 커지면 새 링크는 버림
+MAX_FRONTIER = 1000
+
+
+class DeepCrawler:
+    def __init__(self, specs=None, crawler=None,
+                 concurrency=DEFAULT_CONCURRENCY, per_host=DEFAULT_PER_HOST,
+                 max_pages=None, max_frontier=MAX_FRONTIER):
+        specs = specs if specs is not None else STORE_SPECS
+        self.specs = {key: ExtractionSpec(key, spec) for key, spec in specs.items()}
+        self.crawler = crawler or ConvenienceStoreCrawler(pool_size=concurrency)
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.max_pages = max_pages
+        self.max_frontier = max_frontier
+        self.stats = {}
+
+    def _page_limit(self, spec):
+        return self.max_pages if self.max_pages is not None else spec.max_pages
+
+    def _parse(self, key, url, html):
+        """스레드에서 실행: 제품 + 링크 추출"""
+        spec = self.specs[key]
+        return spec.extract(html, limit=0), spec.links(html, url)
+
+    async def _run(self, out):
+        queue = asyncio.Queue()
+        seen = set()
+        pages = defaultdict(int)       # 편의점별 방문(예약) 페이지 수
+        host_limits = defaultdict(lambda: asyncio.Semaphore(self.per_host))
+        stats = {'pages': 0, 'products': 0, 'errors': 0, 'dropped_links': 0}
+
+        def enqueue(key, url):
+            if url in seen or pages[key] >= self._page_limit(self.specs[key]):
+                return
+            if queue.qsize() >= self.max_frontier:
+                stats['dropped_links'] += 1
+                return
+            seen.add(url)
+            pages[key] += 1
+            queue.put_nowait((key, url))
+
+        async def crawl_page(key, url):
+            host = urlsplit(url).netloc
+            async with host_limits[host]:
+                html = await asyncio.to_thread(self.crawler.http.get_text, url)
+            products, links = await asyncio.to_thread(self._parse, key, url, html)
+
+            crawled_at = datetime.now().isoformat(timespec='seconds')
+            for product in products:
+                out.write(json.dumps(
+                    {'store': key, 'url': url, 'crawled_at': crawled_at, **product},
+                    ensure_ascii=False,
+                ) + "\n")
+            stats['pages'] += 1
+            stats['products'] += len(products)
+
+            for link in links:
+                enqueue(key, link)
+
+        async def worker():
+            while True:
+                key, url = await queue.get()
+                try:
+                    await crawl_page(key, url)
+                except Exception as e:
+                    stats['errors'] += 1
+                    print(f"⚠️ {key} {url} 실패: {e}")
+                finally:
+                    queue.task_done()
+
+        for key, spec in self.specs.items():
+            for url in spec.urls:
+                enqueue(key, url)
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        await queue.join()
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        return stats
+
+    def run(self, out_path):
+        """딥 크롤링 실행 → 통계 dict (pages / products / errors / pages_per_sec ...)"""
+        started = time.perf_counter()
+        with open(out_path, 'w', encoding='utf-8') as out:
+            stats = asyncio.run(self._run(out))
+        elapsed = time.perf_counter() - started
+
+        stats['seconds'] = elapsed
+        stats['pages_per_sec'] = stats['pages'] / elapsed if elapsed > 0 else 0.0
+        self.stats = stats
+        return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="편의점 딥 크롤링")
+    parser.add_argument('--stores', help="쉼표로 구분한 store key (기본: 전체)")
+    parser.add_argument('--out', default=f"/tmp/deep_crawl_{datetime.now().strftime('%Y%m%d_%H%M')}.jsonl")
+    parser.add_argument('--max-pages', type=int, help="편의점당 최대 페이지 (기본: 스펙 max_pages)")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument('--per-host', type=int, default=DEFAULT_PER_HOST)
+    args = parser.parse_args()
+
+    specs = STORE_SPECS
+    if args.stores:
+        specs = {key: spec for key, spec in STORE_SPECS.items() if key in args.stores.split(',')}
+
+    print("=" * 60)
+    print(f"🕸️ 딥 크롤링 시작: {', '.join(specs)}")
+    print("=" * 60)
+
+    crawler = DeepCrawler(specs, concurrency=args.concurrency, per_host=args.per_host, max_pages=args.max_pages)
+    stats = crawler.run(args.out)
+
+    print(f"✅ {stats['pages']}페이지 / 제품 {stats['products']}개 / 에러 {stats['errors']}개 "
+          f"({stats['seconds']:.1f}초, {stats['pages_per_sec']:.1f} pages/sec)")
+    print(crawler.crawler.http.summary_line())
+    print(f"📄 결과: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
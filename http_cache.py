@@ -0,0 +1,107 @@
+"""
+크롤링용 HTTP 캐시 (조건부 GET)
+- 응답 본문(디코딩된 텍스트) + ETag / Last-Modified 를 .cache/http/ 에 저장
+- 다음 요청은 If-None-Match / If-Modified-Since 로 보내고 304 면 저장된 본문 사용
+  → 다운로드도 디코딩도 생략
+- 적중률은 stats() 로 확인
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+
+from config import CACHE_DIR
+
+HTTP_CACHE_DIR = os.path.join(CACHE_DIR, 'http')
+
+
+class HttpCache:
+    def __init__(self, session, cache_dir=HTTP_CACHE_DIR):
+        self.session = session
+        self.cache_dir = cache_dir
+        self.lock = threading.Lock()
+        self.counts = {'hits': 0, 'misses': 0, 'uncacheable': 0}
+
+    def _paths(self, url):
+        """URL 해시 앞 2글자로 폴더 나눔"""
+        digest = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        folder = os.path.join(self.cache_dir, digest[:2])
+        return folder, os.path.join(folder, f"{digest}.json"), os.path.join(folder, f"{digest}.html")
+
+    def _load_meta(self, meta_path, body_path):
+        if not (os.path.exists(meta_path) and os.path.exists(body_path)):
+            return None
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                return json.load(f)
+        except Exception:
+            return None
+
+    def _store(self, url, response):
+        folder, meta_path, body_path = self._paths(url)
+        os.makedirs(folder, exist_ok=True)
+
+        meta = {
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'fetched_at': time.time(),
+        }
+        # 본문 먼저, 메타는 나중 (메타가 있으면 본문도 있다는 보장)
+        for path, write in [(body_path, lambda f: f.write(response.text)),
+                            (meta_path, lambda f: json.dump(meta, f, ensure_ascii=False))]:
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                write(f)
+            os.replace(tmp_path, path)
+
+    def _count(self, key):
+        with self.lock:
+            self.counts[key] += 1
+
+    def get_text(self, url, timeout=10):
+        """URL 본문 텍스트 (304 면 캐시에서)"""
+        _, meta_path, body_path = self._paths(url)
+        meta = self._load_meta(meta_path, body_path)
+
+        headers = {}
+        if meta:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        response = self.session.get(url, headers=headers, timeout=timeout)
+
+        if response.status_code == 304 and meta:
+            self._count('hits')
+            with open(body_path, encoding='utf-8') as f:
+                return f.read()
+
+        response.raise_for_status()
+
+        if response.headers.get('ETag') or response.headers.get('Last-Modified'):
+            self._count('misses')
+            try:
+                self._store(url, response)
+            except Exception as e:
+                print(f"⚠️ HTTP 캐시 저장 실패: {e}")
+        else:
+            # 검증 헤더가 없으면 조건부 요청을 못 보내니 저장 안 함
+            self._count('uncacheable')
+
+        return response.text
+
+    def stats(self):
+        with self.lock:
+            counts = dict(self.counts)
+        total = sum(counts.values())
+        counts['requests'] = total
+        counts['hit_rate'] = counts['hits'] / total if total else 0.0
+        return counts
+
+    def summary_line(self):
+        s = self.stats()
+        return (f"💾 HTTP 캐시: 요청 {s['requests']} / 304 적중 {s['hits']} / 새로 받음 {s['misses']} / "
+                f"캐시 불가 {s['uncacheable']} (적중률 {s['hit_rate']:.0%})")
@@ -0,0 +1,152 @@
+"""
+블로그용 이미지 최적화
+- 표시 폭(360px) 기준 1x / 2x 로 리사이즈
+- WebP (+ AVIF 플러그인 있으면 AVIF) + PNG 대체 이미지
+- 이미지 1장당 IMAGE_MAX_BYTES 안으로 들어올 때까지 품질 단계적으로 낮춤
+- 결과 파일은 원본 이름 + 폭 + 포맷으로 캐시 (이미 있으면 다시 안 만듦)
+"""
+import os
+
+from config import IMAGE_DISPLAY_WIDTH, IMAGE_MAX_BYTES
+
+try:
+    from PIL import Image
+    _PIL_AVAILABLE = True
+except Exception:
+    _PIL_AVAILABLE = False
+
+try:
+    # pip install pillow-avif-plugin 하면 AVIF 도 같이 만듦 (선택)
+    import pillow_avif  # noqa: F401
+except Exception:
+    pass
+
+# 품질 단계 (용량 넘으면 다음 단계로)
+QUALITY_STEPS = [82, 75, 68, 60, 50, 40]
+
+# 1x / 2x
+SCALES = [1, 2]
+
+MIME_TYPES = {
+    'avif': 'image/avif',
+    'webp': 'image/webp',
+    'png': 'image/png',
+}
+
+
+def avif_supported():
+    return _PIL_AVAILABLE and 'AVIF' in Image.SAVE
+
+
+def _resized(src, width):
+    if src.width <= width:
+        return src.copy()
+    height = round(src.height * width / src.width)
+    return src.resize((width, height), Image.LANCZOS)
+
+
+def _save_within_budget(image, path, fmt, max_bytes):
+    """품질 낮춰가며 max_bytes 안으로 저장 → 최종 크기"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+
+    if fmt == 'png':
+        image.save(tmp_path, 'PNG', optimize=True)
+        if os.path.getsize(tmp_path) > max_bytes:
+            # 팔레트(256색)로 줄이기
+            image.quantize(colors=256, method=Image.Quantize.FASTOCTREE).save(tmp_path, 'PNG', optimize=True)
+    else:
+        for quality in QUALITY_STEPS:
+            if fmt == 'webp':
+                image.save(tmp_path, 'WEBP', quality=quality, method=6)
+            else:
+                image.save(tmp_path, 'AVIF', quality=quality, speed=4)
+            if os.path.getsize(tmp_path) <= max_bytes:
+                break
+
+    os.replace(tmp_path, path)
+    size = os.path.getsize(path)
+    if size > max_bytes:
+        print(f"  ⚠️ {os.path.basename(path)}: {size // 1024}KB (용량 예산 {max_bytes // 1024}KB 초과)")
+    return size
+
+
+def optimize_for_web(input_path, display_width=IMAGE_DISPLAY_WIDTH, max_bytes=IMAGE_MAX_BYTES):
+    """
+    input_path 를 웹용으로 변환
+    리턴: {
+        'variants': [{'path', 'format', 'width', 'height', 'bytes'}, ...],
+        'original_bytes': 원본 크기,
+    }
+    Pillow 가 없으면 None
+    """
+    if not _PIL_AVAILABLE:
+        return None
+
+    out_dir = os.path.join(os.path.dirname(input_path), 'web')
+    os.makedirs(out_dir, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(input_path))[0]
+
+    formats = (['avif'] if avif_supported() else []) + ['webp']
+    variants = []
+
+    with Image.open(input_path) as opened:
+        src = opened.convert('RGB')
+
+    def build(fmt, width):
+        path = os.path.join(out_dir, f"{stem}_{width}w_{max_bytes // 1024}k.{fmt}")
+        if os.path.exists(path):
+            with Image.open(path) as cached:
+                height = cached.height
+            size = os.path.getsize(path)
+        else:
+            image = _resized(src, width)
+            height = image.height
+            size = _save_within_budget(image, path, fmt, max_bytes)
+        variants.append({'path': path, 'format': fmt, 'width': width, 'height': height, 'bytes': size})
+
+    for fmt in formats:
+        for scale in SCALES:
+            build(fmt, min(src.width, display_width * scale))
+
+    # 구형 브라우저용 PNG 는 1x 만
+    build('png', min(src.width, display_width))
+
+    return {'variants': variants, 'original_bytes': os.path.getsize(input_path)}
+
+
+def picture_html(urls, result, alt, style):
+    """
+    <picture> 태그 생성
+    urls: variant path → 업로드된 URL
+    """
+    sources = []
+    fallback = None
+    for fmt in ['avif', 'webp']:
+        items = [v for v in result['variants'] if v['format'] == fmt and v['path'] in urls]
+        if items:
+            srcset = ", ".join(f"{urls[v['path']]} {v['width']}w" for v in items)
+            sources.append(
+                f'<source type="{MIME_TYPES[fmt]}" srcset="{srcset}" '
+                f'sizes="(max-width: {IMAGE_DISPLAY_WIDTH}px) 100vw, {IMAGE_DISPLAY_WIDTH}px">'
+            )
+
+    for v in result['variants']:
+        if v['format'] == 'png' and v['path'] in urls:
+            fallback = v
+
+    if not fallback:
+        return None
+
+    img = (f'<img src="{urls[fallback["path"]]}" alt="{alt}" width="{fallback["width"]}" '
+           f'height="{fallback["height"]}" loading="lazy" style="{style}">')
+    return f'<picture>{"".join(sources)}{img}</picture>'
+
+
+def bytes_report(result):
+    """독자가 실제로 받는 1x 이미지 크기 vs 원본"""
+    original = result['original_bytes']
+    one_x = [v for v in result['variants'] if v['width'] <= IMAGE_DISPLAY_WIDTH]
+    served = min(v['bytes'] for v in one_x) if one_x else original
+    saved = original - served
+    pct = saved / original * 100 if original else 0
+    return {'original_bytes': original, 'served_bytes': served, 'saved_bytes': saved, 'saved_pct': pct}
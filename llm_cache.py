@@ -0,0 +1,119 @@
+"""
+LLM 응답 캐시 (SQLite)
+- 키: sha256(provider, model, prompt, 생성 설정)
+- 값: 검증 / 복구(llm_json)까지 끝난 결과 JSON 텍스트 (zlib 압축)
+  → 모델 원본 응답이 아님 (다시 파싱해도 고칠 게 없음)
+- TTL 지나면 만료, 전체 크기가 넘치면 오래 안 쓴 것부터 삭제 (LRU)
+- LLM_CACHE_DISABLE=1 이면 읽기/쓰기 모두 건너뜀
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from config import CACHE_DIR, LLM_CACHE_DISABLE, LLM_CACHE_TTL_HOURS, LLM_CACHE_MAX_MB
+
+DB_PATH = os.path.join(CACHE_DIR, 'llm_cache.sqlite')
+
+_conn = None
+_lock = threading.Lock()
+
+
+def _db():
+    global _conn
+    if _conn is None:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        _conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+        _conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                provider TEXT,
+                model TEXT,
+                created REAL,
+                accessed REAL,
+                size INTEGER,
+                value BLOB
+            )
+        """)
+        _conn.execute("CREATE INDEX IF NOT EXISTS idx_accessed ON responses(accessed)")
+        _conn.commit()
+    return _conn
+
+
+def make_key(provider, model, prompt, config):
+    """provider/model/prompt/생성 설정으로 캐시 키 생성"""
+    raw = json.dumps([provider, model, prompt, config], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def get(provider, model, prompt, config):
+    """캐시된 결과 JSON 텍스트 (없거나 만료면 None)"""
+    if LLM_CACHE_DISABLE:
+        return None
+
+    key = make_key(provider, model, prompt, config)
+    now = time.time()
+
+    try:
+        with _lock:
+            db = _db()
+            row = db.execute("SELECT created, value FROM responses WHERE key = ?", (key,)).fetchone()
+            if not row:
+                return None
+
+            created, value = row
+            if now - created > LLM_CACHE_TTL_HOURS * 3600:
+                db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                db.commit()
+                return None
+
+            db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            db.commit()
+
+        print(f"  💾 {provider} 캐시 적중 (API 호출 생략)")
+        return zlib.decompress(value).decode('utf-8')
+
+    except Exception as e:
+        print(f"  ⚠️ LLM 캐시 읽기 실패: {e}")
+        return None
+
+
+def put(provider, model, prompt, config, text):
+    """결과 JSON 텍스트(json.dumps 한 것) 저장 후 용량 초과분 LRU 삭제"""
+    if LLM_CACHE_DISABLE or not text:
+        return
+
+    key = make_key(provider, model, prompt, config)
+    value = zlib.compress(text.encode('utf-8'))
+    now = time.time()
+
+    try:
+        with _lock:
+            db = _db()
+            db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, provider, model, now, now, len(value), value),
+            )
+            _evict(db, now)
+            db.commit()
+    except Exception as e:
+        print(f"  ⚠️ LLM 캐시 저장 실패: {e}")
+
+
+def _evict(db, now):
+    """만료된 항목 삭제 + 최대 크기 넘으면 오래 안 쓴 것부터 삭제"""
+    db.execute("DELETE FROM responses WHERE created < ?", (now - LLM_CACHE_TTL_HOURS * 3600,))
+
+    max_bytes = LLM_CACHE_MAX_MB * 1024 * 1024
+    total = db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+    if total <= max_bytes:
+        return
+
+    for key, size in db.execute("SELECT key, size FROM responses ORDER BY accessed").fetchall():
+        db.execute("DELETE FROM responses WHERE key = ?", (key,))
+        total -= size
+        if total <= max_bytes:
+            break
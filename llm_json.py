@@ -0,0 +1,272 @@
+"""
+AI 가 준 JSON 검증 + 로컬 복구
+- ```json 코드블록, 앞뒤 잡담 제거
+- 끝에 붙은 쉼표 제거
+- 중간에 끊긴 JSON: 열린 문자열 / 괄호 닫기 (어느 필드에서 끊겼는지 기록)
+- 객체 대신 배열로 주면 첫번째 객체 사용
+- 스키마 검사 (필드별 타입, tags 가 문자열이면 리스트로)
+- 그래도 필드가 비거나 문자열이 끊겼으면 그 부분만 이어서 써달라고 한번 더 요청
+
+    data, report = llm_json.load_or_continue(text, {'title': str, 'tags': list, 'content': str},
+                                             prompt, ask=lambda p: 같은 프로바이더 호출)
+"""
+import json
+import re
+
+POST_SCHEMA = {'title': str, 'tags': list, 'content': str}
+
+_FENCE = re.compile(r'^\s*```(?:json)?\s*|\s*```\s*$', re.IGNORECASE)
+_PARTIAL_LITERAL = re.compile(r'([:\[,])\s*[A-Za-z]+$')
+_DANGLING_KEY = re.compile(r',?\s*"(?:[^"\\]|\\.)*"\s*:$')
+_DECODER = json.JSONDecoder()
+
+# 이어쓰기 요청에 보여줄 끊긴 문자열 끝부분 길이
+CONTINUATION_TAIL = 300
+
+
+class InvalidJSON(ValueError):
+    """복구해도 못 쓰는 응답"""
+
+
+def _decode(text):
+    """json.loads 와 같지만 JSON 뒤에 붙은 잡담은 무시"""
+    data, _ = _DECODER.raw_decode(text)
+    return data
+
+
+def _strip_wrapping(text):
+    """코드블록 / 앞뒤 설명 문장 제거"""
+    text = _FENCE.sub('', text or '').strip()
+    starts = [i for i in (text.find('{'), text.find('[')) if i >= 0]
+    return text[min(starts):] if starts else text
+
+
+def _strip_trailing_commas(text):
+    """문자열 밖의 ', }' / ', ]' 에서 쉼표 제거"""
+    out = []
+    in_string = escape = False
+    for ch in text:
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == '\\':
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in '}]':
+            while out and out[-1] in ' \t\r\n':
+                out.pop()
+            if out and out[-1] == ',':
+                out.pop()
+        out.append(ch)
+    return "".join(out)
+
+
+def _close_truncated(text):
+    """
+    끊긴 JSON 닫기 → (고친 텍스트, 끊긴 최상위 필드 이름 / 없으면 None)
+    최상위 객체는 처음 나온 '{' (배열로 감싼 경우 포함)
+    """
+    stack = []
+    root = None
+    in_string = escape = False
+    expect_key = False
+    string_start = 0
+    key = None
+
+    for i, ch in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == '\\':
+                escape = True
+            elif ch == '"':
+                in_string = False
+                if expect_key and len(stack) == root:
+                    try:
+                        key = json.loads(text[string_start:i + 1])
+                    except ValueError:
+                        pass
+            continue
+        if ch == '"':
+            in_string = True
+            string_start = i
+        elif ch in '{[':
+            stack.append('}' if ch == '{' else ']')
+            expect_key = ch == '{'
+            if ch == '{' and root is None:
+                root = len(stack)
+        elif ch in '}]':
+            if stack:
+                stack.pop()
+            expect_key = False
+        elif ch == ',':
+            expect_key = bool(stack) and stack[-1] == '}'
+        elif ch == ':':
+            expect_key = False
+
+    if not stack and not in_string:
+        return text, None
+
+    # 최상위 객체 안에서 값을 쓰다가 끊긴 경우만 "필드가 끊겼다" 로 봄
+    truncated = None
+    if root is not None and len(stack) >= root and not (in_string and expect_key and len(stack) == root):
+        truncated = key
+
+    out = text
+    if in_string and expect_key:
+        out = out[:string_start]       # 키 이름 쓰다가 끊김 → 키 버림
+    elif in_string:
+        if escape:
+            out = out[:-1]
+        out += '"'
+    out = _PARTIAL_LITERAL.sub(r'\1', out)  # tru / nul 같은 덜 쓴 값
+
+    while True:
+        out = out.rstrip()
+        if out.endswith(','):
+            out = out[:-1]
+        elif out.endswith(':'):
+            out = _DANGLING_KEY.sub('', out)
+        else:
+            break
+
+    return out + "".join(reversed(stack)), truncated
+
+
+def loads(text):
+    """
+    복구하면서 json.loads → (data, 고친 내용 리스트, 끊긴 필드)
+    못 고치면 InvalidJSON
+    """
+    repairs = []
+    cleaned = _strip_wrapping(text)
+    if cleaned != (text or '').strip():
+        repairs.append('앞뒤 텍스트 제거')
+
+    try:
+        return _decode(cleaned), repairs, None
+    except ValueError:
+        pass
+
+    fixed = _strip_trailing_commas(cleaned)
+    if fixed != cleaned:
+        repairs.append('끝 쉼표 제거')
+        try:
+            return _decode(fixed), repairs, None
+        except ValueError:
+            pass
+
+    closed, truncated = _close_truncated(fixed)
+    if closed != fixed:
+        repairs.append(f"끊긴 JSON 닫기 ({truncated})" if truncated else '끊긴 JSON 닫기')
+    try:
+        return _decode(_strip_trailing_commas(closed)), repairs, truncated
+    except ValueError as e:
+        raise InvalidJSON(f"JSON 복구 실패: {e}") from e
+
+
+def validate(data, schema, report):
+    """스키마에 맞게 정리 → dict (모자란 필드는 report['missing'] 에)"""
+    if isinstance(data, list):
+        data = next((item for item in data if isinstance(item, dict)), None)
+        report['repairs'].append('배열 → 첫번째 객체')
+    if not isinstance(data, dict):
+        raise InvalidJSON(f"객체가 아님: {type(data).__name__}")
+
+    missing = []
+    for field, kind in schema.items():
+        value = data.get(field)
+        if kind is list and isinstance(value, str):
+            value = [t.strip().lstrip('#') for t in re.split(r'[,#\n]', value) if t.strip().lstrip('#')]
+            data[field] = value
+            report['repairs'].append(f"{field} 문자열 → 리스트")
+        elif kind is str and isinstance(value, (int, float)):
+            value = data[field] = str(value)
+
+        # 빈 문자열은 없는 걸로 (빈 tags 리스트는 괜찮음)
+        if not isinstance(value, kind) or (kind is str and not value.strip()):
+            missing.append(field)
+
+    # 리스트 안에서 끊겼으면 마지막 항목은 반쪽짜리 → 앞에 멀쩡한 게 있으면 버림
+    truncated = report.get('truncated')
+    if truncated and isinstance(data.get(truncated), list) and len(data[truncated]) > 1:
+        data[truncated].pop()
+        report['repairs'].append(f"{truncated} 마지막 항목(잘림) 제거")
+        report['truncated'] = None
+
+    report['missing'] = missing
+    return data
+
+
+def load(text, schema=POST_SCHEMA):
+    """복구 + 스키마 검사 → (data, report)"""
+    data, repairs, truncated = loads(text)
+    report = {'repairs': repairs, 'truncated': truncated, 'missing': [], 'continued': False}
+    return validate(data, schema, report), report
+
+
+def continuation_prompt(prompt, data, schema, report):
+    """끊긴 문자열 / 빠진 필드만 달라고 하는 프롬프트"""
+    asks = {}
+    truncated = report.get('truncated')
+    if truncated and schema.get(truncated) is str and isinstance(data.get(truncated), str):
+        asks[f"{truncated}_rest"] = (
+            f"{truncated} 가 '...{data[truncated][-CONTINUATION_TAIL:]}' 에서 끊겼음. 바로 뒤에 이어질 나머지 부분만"
+        )
+    for field in report['missing']:
+        asks[field] = f"{field} ({'리스트' if schema[field] is list else '문자열'})"
+
+    return f"""{prompt}
+
+---
+이전 응답이 중간에 끊겼습니다. 이미 받은 부분은 다시 쓰지 말고, 아래 필드만 JSON 으로 주세요:
+{json.dumps(asks, ensure_ascii=False, indent=1)}
+"""
+
+
+def needs_continuation(schema, report):
+    truncated = report.get('truncated')
+    return bool(report['missing']) or (truncated is not None and schema.get(truncated) is str)
+
+
+def load_or_continue(text, schema, prompt, ask=None):
+    """
+    load() 후 끊기거나 빠진 게 있으면 ask(이어쓰기 프롬프트) 로 한번 더 받아서 합침
+    - ask: 프롬프트 → 응답 텍스트 (같은 프로바이더)
+    - 끝까지 필수 필드가 비면 InvalidJSON
+    리턴: (data, report)
+    """
+    data, report = load(text, schema)
+
+    if needs_continuation(schema, report) and ask:
+        try:
+            extra, _, _ = loads(ask(continuation_prompt(prompt, data, schema, report)))
+            if isinstance(extra, list):
+                extra = next((item for item in extra if isinstance(item, dict)), {})
+            truncated = report.get('truncated')
+            rest = extra.pop(f"{truncated}_rest", None) if truncated else None
+            if isinstance(rest, str):
+                data[truncated] += rest
+            for field, value in extra.items():
+                if field in schema and not data.get(field):
+                    data[field] = value
+            report['continued'] = True
+            report['truncated'] = None
+            data = validate(data, schema, report)
+        except Exception as e:
+            report['repairs'].append(f"이어쓰기 실패: {str(e)[:60]}")
+
+    if report['missing']:
+        raise InvalidJSON(f"필수 필드 없음: {', '.join(report['missing'])}")
+    return data, report
+
+
+def describe(report):
+    """로그용 한 줄 (고친 게 없으면 빈 문자열)"""
+    parts = list(report['repairs'])
+    if report.get('continued'):
+        parts.append('이어쓰기 요청')
+    return ", ".join(parts)
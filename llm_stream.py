@@ -0,0 +1,244 @@
+"""
+AI 응답 스트리밍
+- Gemini: streamGenerateContent?alt=sse / OpenAI·Groq: stream: true (둘 다 SSE)
+- 조각이 올 때마다 JsonFieldStream 에 넣어서 title / tags / content 가 완성되는 즉시 콜백
+  → 본문 생성이 끝나기 전에 검증, 이미지 준비 같은 후속 작업 시작
+- 멈춘 스트림은 requests timeout=(연결, 읽기) 의 읽기 타임아웃으로 바로 감지
+  (예전엔 120초 전체 타임아웃까지 기다림)
+- cancel_on(event) 블록 안에서는 event 가 set 되면 (헤지 경주에서 짐) 응답을 닫고 StreamCancelled
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import requests
+
+import rate_limiter
+import token_accounting
+
+STREAM_CONNECT_TIMEOUT = float(os.environ.get('LLM_STREAM_CONNECT_TIMEOUT', '10'))
+# 이 시간 동안 조각이 하나도 안 오면 멈춘 걸로 판단
+STREAM_IDLE_TIMEOUT = float(os.environ.get('LLM_STREAM_IDLE_TIMEOUT', '20'))
+# 조각이 계속 오더라도 전체 생성 시간 상한 (예전 타임아웃과 동일)
+STREAM_MAX_SECONDS = 120
+
+_WHITESPACE = ' \t\r\n'
+
+_context = threading.local()
+
+
+class StreamStalled(Exception):
+    """스트림이 멈췄거나 너무 오래 걸림"""
+
+
+class StreamCancelled(Exception):
+    """cancel_on 의 event 가 set 돼서 중단 (다른 프로바이더가 이미 이김)"""
+
+
+@contextmanager
+def cancel_on(event):
+    """이 블록 안에서 나가는 stream_json 은 event 가 set 되면 중단"""
+    previous = getattr(_context, 'cancel', None)
+    _context.cancel = event
+    try:
+        yield
+    finally:
+        _context.cancel = previous
+
+
+def cancelled():
+    """이 스레드의 호출이 취소됐는지 (cancel_on 밖이면 항상 False)"""
+    event = getattr(_context, 'cancel', None)
+    return event is not None and event.is_set()
+
+
+class JsonFieldStream:
+    """
+    JSON 텍스트를 조각조각 받으면서 최상위 객체의 필드가 완성될 때마다 on_field(name, value) 호출
+    - 최상위가 배열이면 ([{...}, ...]) 첫번째 객체 기준 (뒤쪽 텍스트도 buffer 에는 전부 모음)
+    - 문자열 안의 괄호 / 이스케이프 처리
+    - on_field 에서 예외를 던지면 feed() 밖으로 그대로 나감 (검증 실패 → 스트림 중단용)
+    """
+
+    def __init__(self, on_field=None):
+        self.on_field = on_field
+        self.fields = {}
+        self.buffer = ""
+        self.pos = 0
+        self.depth = 0
+        self.root_depth = None    # 최상위 객체 안쪽 깊이
+        self.done = False
+        self.in_string = False
+        self.escape = False
+        self.string_start = None
+        self.expect = 'key'
+        self.key = None
+        self.value_start = None
+
+    def _emit(self, end):
+        raw = self.buffer[self.value_start:end]
+        self.value_start = None
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            return  # 깨진 값은 마지막 json.loads 에서 처리
+        self.fields[self.key] = value
+        if self.on_field:
+            self.on_field(self.key, value)
+
+    def feed(self, text):
+        if not text:
+            return
+        self.buffer += text
+        if self.done:
+            return  # 첫 객체는 끝났고 나머지(배열의 다음 글 등)는 모으기만
+        buf = self.buffer
+
+        for i in range(self.pos, len(buf)):
+            ch = buf[i]
+
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == '\\':
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+                    if self.depth == self.root_depth:
+                        if self.expect == 'key':
+                            self.key = json.loads(buf[self.string_start:i + 1])
+                        else:
+                            self._emit(i + 1)
+                continue
+
+            # 최상위 객체 시작 전 ('[' 로 감싼 경우 포함)
+            if self.root_depth is None:
+                if ch == '[':
+                    self.depth += 1
+                elif ch == '{':
+                    self.depth += 1
+                    self.root_depth = self.depth
+                continue
+
+            if self.depth > self.root_depth:
+                # 값 안쪽 (중첩 객체/배열)
+                if ch == '"':
+                    self.in_string = True
+                elif ch in '{[':
+                    self.depth += 1
+                elif ch in '}]':
+                    self.depth -= 1
+                    if self.depth == self.root_depth:
+                        self._emit(i + 1)
+                continue
+
+            # 최상위 객체 바로 안쪽
+            if ch == '"':
+                self.in_string = True
+                self.string_start = i
+                if self.expect == 'value':
+                    self.value_start = i
+            elif ch == ':':
+                self.expect = 'value'
+                self.value_start = None
+            elif ch in ',}':
+                if self.value_start is not None:
+                    self._emit(i)  # 숫자 / true / null 같은 값
+                self.expect = 'key'
+                if ch == '}':
+                    self.depth -= 1
+                    self.done = True
+                    break
+            elif ch in '{[':
+                self.value_start = i
+                self.depth += 1
+            elif ch not in _WHITESPACE and self.expect == 'value' and self.value_start is None:
+                self.value_start = i
+
+        self.pos = len(buf)
+
+
+def _sse_events(response, started):
+    """SSE 'data:' 줄 → dict"""
+    try:
+        for line in response.iter_lines(chunk_size=256, decode_unicode=True):
+            if cancelled():
+                raise StreamCancelled("다른 프로바이더 승리")
+            if time.monotonic() - started > STREAM_MAX_SECONDS:
+                raise StreamStalled(f"{STREAM_MAX_SECONDS}초 넘게 생성 중")
+            if not line or not line.startswith('data:'):
+                continue
+            payload = line[5:].strip()
+            if payload == '[DONE]':
+                return
+            yield json.loads(payload)
+    except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+        # 스트리밍 중 읽기 타임아웃은 ConnectionError 로 올라옴
+        raise StreamStalled(f"{STREAM_IDLE_TIMEOUT:.0f}초 동안 응답 조각 없음: {e}") from e
+
+
+def _gemini_delta(event):
+    candidates = event.get('candidates') or [{}]
+    parts = candidates[0].get('content', {}).get('parts', [])
+    return "".join(part.get('text', '') for part in parts)
+
+
+def _openai_delta(event):
+    choices = event.get('choices') or []
+    if not choices:
+        return ""
+    return (choices[0].get('delta') or {}).get('content') or ""
+
+
+def stream_json(provider, url, prompt, payload, on_field=None, retries=0,
+                completion_tokens=rate_limiter.DEFAULT_COMPLETION_TOKENS, **kwargs):
+    """
+    스트리밍 요청 → 파싱 안 한 전체 응답 텍스트
+    - provider: 'gemini' 면 Gemini 형식, 나머지는 OpenAI 호환 형식
+    - payload: 요청 JSON / kwargs: headers 등 requests.post 인자
+    - retries / completion_tokens: rate_limiter.post 와 같음 (429 재시도 / 미리 잡아둘 출력 토큰)
+    """
+    delta = _gemini_delta if provider == 'gemini' else _openai_delta
+
+    if cancelled():
+        raise StreamCancelled("요청 전에 취소됨")
+
+    started = time.monotonic()
+    response = rate_limiter.post(
+        provider, url, prompt, retries=retries, completion_tokens=completion_tokens, json=payload, stream=True,
+        timeout=(STREAM_CONNECT_TIMEOUT, STREAM_IDLE_TIMEOUT), **kwargs
+    )
+    if not response.ok:
+        response.close()
+        response.raise_for_status()
+
+    # 사용량은 마지막 이벤트에 옴 (Gemini usageMetadata / OpenAI usage / Groq x_groq.usage)
+    usage = None
+    parser = JsonFieldStream(on_field)
+    try:
+        with response:
+            response.encoding = 'utf-8'  # text/event-stream 은 charset 이 없을 때가 많음
+            for event in _sse_events(response, started):
+                parser.feed(delta(event))
+                usage = token_accounting.usage_from_json(event) or usage
+    except StreamCancelled:
+        # 진 쪽 호출도 받은 만큼은 돈이 나감 → 마지막 사용량(없으면 받은 텍스트 추정치)으로 정산, 취소로 표시
+        rate_limiter.settle(provider, url, payload, prompt, usage, time.monotonic() - started, ok=False,
+                            completion_tokens=completion_tokens, cancelled=True, streamed_text=parser.buffer)
+        raise
+    except Exception:
+        rate_limiter.settle(provider, url, payload, prompt, usage, time.monotonic() - started, ok=False,
+                            completion_tokens=completion_tokens)
+        raise
+
+    rate_limiter.settle(provider, url, payload, prompt, usage, time.monotonic() - started,
+                        completion_tokens=completion_tokens)
+    return parser.buffer
+
+
+def replay(text, on_field):
+    """캐시/비스트리밍 응답도 같은 콜백을 받도록 전체 텍스트를 한번에 흘려줌"""
+    if on_field and text:
+        JsonFieldStream(on_field).feed(text)
@@ -1,15 +1,49 @@
 """
 한번에 6개 글 생성 - 초고속 버전
+- single  : 1번 요청으로 6개 글 (예전 방식, 하나만 깨져도 6개 다 날아감)
+- parallel: 편의점별(또는 chunk 단위) 요청을 동시에 보내고 끝나는 대로 모음
+            실패한 편의점만 다시 요청
+- compare : 두 방식을 차례로 실행해서 처리량 / 부분 실패 비교
+- 요청마다 streamGenerateContent 로 받음 (llm_stream) → 멈춘 응답은 읽기 타임아웃으로 바로 끊고,
+  제목이 비어 있으면 본문을 기다리지 않고 그 요청만 실패 처리 (AI_STREAM=0 이면 한번에 받음)
+
+사용법:
+    python main_batch.py                      # parallel
+    python main_batch.py --mode single
+    python main_batch.py --mode parallel --chunk 2
+    python main_batch.py --mode compare
 """
 import os
+import sys
 import json
-import requests
+import time
 from datetime import datetime
 from zoneinfo import ZoneInfo
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import rate_limiter
+import llm_cache
+import llm_json
+import llm_stream
+import token_accounting
+import tracing
 
 GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
 KST = ZoneInfo('Asia/Seoul')
 
+GEMINI_MODEL = "gemini-2.0-flash-exp"
+
+# 스트리밍 (ai_providers 와 같은 환경변수)
+AI_STREAM = os.environ.get('AI_STREAM', '1') == '1'
+
+# 동시 요청 수 / 실패한 편의점 재시도 횟수
+BATCH_CONCURRENCY = int(os.environ.get('BATCH_CONCURRENCY', '6'))
+BATCH_RETRIES = int(os.environ.get('BATCH_RETRIES', '1'))
+
+# 요청당 출력 토큰 (글 1개 기준, chunk 면 글 수만큼 곱함)
+TOKENS_PER_POST = 6144
+SINGLE_SHOT_TOKENS = 32768
+
 # 6개 편의점 정보
 STORES = [
     {'key': 'GS25', 'name': 'GS25', 'country': 'kr', 'time': '08:00'},
@@ -21,24 +55,27 @@ STORES = [
 ]
 
 
-def generate_all_posts_at_once():
-    """1번 요청으로 6개 글 모두 생성"""
-    
-    print("🚀 한번에 6개 글 생성 시작!")
-    print("=" * 60)
-    
-    # 프롬프트 구성
-    prompt = f"""당신은 한국과 일본 편의점을 소개하는 인기 블로거입니다.
+# =========================
+# 프롬프트
+# =========================
+def _store_line(i, store):
+    country = '한국' if store['country'] == 'kr' else '일본'
+    if store.get('name_jp'):
+        country += f", {store['name_jp']}"
+    return f"{i}. {store['name']} ({country}) - store_key: {store['key']} - 발행 시간: {store['time'][:2]}시"
+
+
+def build_prompt(stores):
+    """편의점 목록 → 프롬프트 (JSON 배열, 편의점당 글 1개)"""
+    store_lines = "\n".join(_store_line(i, s) for i, s in enumerate(stores, 1))
+    n = len(stores)
+
+    return f"""당신은 한국과 일본 편의점을 소개하는 인기 블로거입니다.
 오늘 날짜: {datetime.now(KST).strftime('%Y년 %m월 %d일')}
 
-아래 6개 편의점의 신상 제품 블로그 글을 **한번에** 생성해주세요:
+아래 {n}개 편의점의 신상 제품 블로그 글을 생성해주세요:
 
-1. GS25 (한국) - 발행 시간: 08시
-2. 세븐일레븐 (일본, セブンイレブン) - 발행 시간: 09시
-3. CU (한국) - 발행 시간: 12시
-4. 패밀리마트 (일본, ファミリーマート) - 발행 시간: 13시
-5. 세븐일레븐 (한국) - 발행 시간: 20시
-6. 로손 (일본, ローソン) - 발행 시간: 21시
+{store_lines}
 
 요구사항:
 - 각 편의점마다 신상 제품 2-3개 소개
@@ -47,7 +84,7 @@ def generate_all_posts_at_once():
 - HTML 형식으로 작성 (이전 예시 참고)
 - 친근하고 MZ세대 스타일
 
-JSON 배열로 반환:
+JSON 배열로 반환 (총 {n}개, store_key 는 위에 적힌 그대로):
 [
   {{
     "store_key": "GS25",
@@ -64,67 +101,251 @@ JSON 배열로 반환:
     "tags": ["일본편의점", "세븐일레븐", "セブンイレブン"],
     "category": "일본편의점",
     "country": "jp"
-  }},
-  ... (총 6개)
+  }}
 ]
 
 중요: 각 편의점이 서로 다른 제품을 소개하도록 하고, 실제 있을법한 제품으로 작성하세요.
 """
 
-    try:
-        # Gemini API 호출
-        url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash-exp:generateContent?key={GEMINI_API_KEY}"
-        
-        data = {
-            "contents": [{
-                "parts": [{"text": prompt}]
-            }],
-            "generationConfig": {
-                "temperature": 0.9,
-                "topK": 40,
-                "topP": 0.95,
-                "maxOutputTokens": 32768,  # 긴 응답을 위해 증가
-                "responseMimeType": "application/json"
-            }
-        }
-        
-        print("📡 Gemini API 호출 중...")
-        response = requests.post(url, json=data, timeout=120)
+
+# =========================
+# Gemini 호출
+# =========================
+def _gemini_config(max_tokens):
+    return {
+        "temperature": 0.9,
+        "topK": 40,
+        "topP": 0.95,
+        "maxOutputTokens": max_tokens,
+        "responseMimeType": "application/json"
+    }
+
+
+def _check_field(name, value):
+    """스트리밍 중 (첫번째) 글의 필드가 완성될 때마다 → 제목이 비었으면 바로 중단"""
+    if name == 'title' and not (isinstance(value, str) and value.strip()):
+        raise ValueError("title 이 비어있음")
+
+
+@tracing.traced('call_gemini')
+def _call_gemini(prompt, max_tokens, retries=2):
+    """
+    Gemini 호출 → 응답 텍스트 (끊긴 JSON 은 로컬에서 고친 것)
+    캐시 저장은 안 함 - 글이 다 멀쩡한지 확인한 쪽(_request_chunk 등)에서 _cache_put
+    """
+    config = _gemini_config(max_tokens)
+    data = {"contents": [{"parts": [{"text": prompt}]}], "generationConfig": config}
+
+    if AI_STREAM:
+        url = f"https://generativelanguage.googleapis.com/v1beta/models/{GEMINI_MODEL}:streamGenerateContent?alt=sse&key={GEMINI_API_KEY}"
+        result_text = llm_stream.stream_json('gemini', url, prompt, data, on_field=_check_field,
+                                             retries=retries, completion_tokens=max_tokens)
+    else:
+        url = f"https://generativelanguage.googleapis.com/v1beta/models/{GEMINI_MODEL}:generateContent?key={GEMINI_API_KEY}"
+        response = rate_limiter.post('gemini', url, prompt, retries=retries,
+                                     completion_tokens=max_tokens, json=data, timeout=120)
         response.raise_for_status()
-        
         result_text = response.json()['candidates'][0]['content']['parts'][0]['text']
-        posts = json.loads(result_text)
-        
-        print(f"✅ 성공! {len(posts)}개 글 생성 완료!")
-        print("=" * 60)
-        
-        # 각 글 정보 출력
-        for i, post in enumerate(posts, 1):
-            print(f"[{i}/6] {post.get('store_key', 'Unknown')}")
-            print(f"   제목: {post.get('title', 'No title')[:50]}...")
-            print(f"   길이: {len(post.get('content', ''))} 자")
-            print()
-        
-        return posts
-        
+
+    # 끝 쉼표 / 끊긴 배열은 로컬에서 고침 (못 고치면 InvalidJSON)
+    data, repairs, truncated = llm_json.loads(result_text)
+    if truncated and isinstance(data, list) and data:
+        data.pop()  # 쓰다 만 마지막 글은 버림 → 그 편의점만 재시도
+        repairs.append('잘린 마지막 글 제거')
+    if repairs:
+        print(f"   🩹 JSON 복구: {', '.join(repairs)}")
+        result_text = json.dumps(data, ensure_ascii=False)
+    return result_text
+
+
+def _cached(prompt, max_tokens):
+    return llm_cache.get('gemini', GEMINI_MODEL, prompt, _gemini_config(max_tokens))
+
+
+def _cache_put(prompt, max_tokens, result_text):
+    llm_cache.put('gemini', GEMINI_MODEL, prompt, _gemini_config(max_tokens), result_text)
+
+
+def _valid_posts(posts, stores):
+    """응답에서 요청한 편의점의 멀쩡한 글만 골라냄 → {store_key: post}"""
+    if isinstance(posts, dict):
+        posts = [posts]
+
+    wanted = {s['key'] for s in stores}
+    valid = {}
+    for post in posts if isinstance(posts, list) else []:
+        if not isinstance(post, dict):
+            continue
+        key = post.get('store_key')
+        # 1개짜리 요청이면 store_key 를 빼먹어도 그 편의점 글로 인정
+        if key not in wanted and len(stores) == 1:
+            key = stores[0]['key']
+            post['store_key'] = key
+        if key in wanted and post.get('title') and post.get('content'):
+            valid[key] = post
+    return valid
+
+
+def _request(stores, prompt, max_tokens, retries=2, use_cache=True):
+    """
+    편의점 묶음 1개 요청 → {store_key: post}
+    - 캐시는 요청한 편의점 글이 전부 멀쩡할 때만 저장 (잘렸거나 빠진 응답은 저장 안 함)
+    - use_cache=False: 캐시를 안 읽음 (재시도 때 같은 프롬프트로 같은 나쁜 응답을 받지 않도록)
+    """
+    result_text = _cached(prompt, max_tokens) if use_cache else None
+    from_cache = result_text is not None
+    if not from_cache:
+        result_text = _call_gemini(prompt, max_tokens, retries=retries)
+
+    posts = _valid_posts(json.loads(result_text), stores)
+    if not from_cache and len(posts) == len(stores):
+        _cache_put(prompt, max_tokens, result_text)
+    return posts
+
+
+def _request_chunk(stores, use_cache=True):
+    """편의점 묶음 1개 요청 → {store_key: post} (빠진 편의점은 호출하는 쪽에서 재시도)"""
+    with token_accounting.store(','.join(s['key'] for s in stores)):
+        return _request(stores, build_prompt(stores), TOKENS_PER_POST * len(stores), use_cache=use_cache)
+
+
+# =========================
+# 생성 방식
+# =========================
+def generate_all_posts_at_once():
+    """1번 요청으로 6개 글 모두 생성 → 글 리스트 (실패하면 None)"""
+    report = generate_all_posts_report()
+    return report['posts'] or None
+
+
+def generate_all_posts_report():
+    """generate_all_posts_at_once 와 같은 요청 → 비교용 리포트 dict"""
+
+    print("🚀 한번에 6개 글 생성 시작!")
+    print("=" * 60)
+
+    started = time.perf_counter()
+    report = {'mode': 'single', 'requests': 1, 'posts': [], 'failed': [], 'seconds': 0.0}
+
+    try:
+        prompt = build_prompt(STORES)
+        print(f"📡 Gemini API 호출 중... (프롬프트 약 {token_accounting.estimate_tokens(prompt)} 토큰)")
+        with token_accounting.store('전체'):
+            posts = _request(STORES, prompt, SINGLE_SHOT_TOKENS, retries=0)
+
+        report['posts'] = [posts[s['key']] for s in STORES if s['key'] in posts]
+        report['failed'] = [s['key'] for s in STORES if s['key'] not in posts]
+        print(f"✅ 성공! {len(report['posts'])}개 글 생성 완료!")
+
     except Exception as e:
         print(f"❌ 에러 발생: {e}")
-        import traceback
-        traceback.print_exc()
-        return None
+        report['failed'] = [s['key'] for s in STORES]
 
+    report['seconds'] = time.perf_counter() - started
+    return report
 
-if __name__ == "__main__":
-    # 테스트 실행
-    posts = generate_all_posts_at_once()
-    
+
+def generate_posts_parallel(stores=STORES, chunk_size=1, workers=BATCH_CONCURRENCY, retries=BATCH_RETRIES):
+    """
+    편의점을 chunk_size 개씩 나눠 동시에 요청
+    - 끝나는 순서대로 결과를 모음
+    - 실패했거나 응답에서 빠진 편의점만 1개씩 다시 요청 (retries 번까지)
+    """
+    print(f"🚀 편의점별 동시 생성 시작! (chunk {chunk_size}, 동시 {workers})")
+    print("=" * 60)
+
+    started = time.perf_counter()
+    done = {}
+    requests_sent = 0
+    pending = [stores[i:i + chunk_size] for i in range(0, len(stores), chunk_size)]
+
+    for attempt in range(retries + 1):
+        if not pending:
+            break
+        if attempt:
+            print(f"🔁 재시도 {attempt}/{retries}: {', '.join(s['key'] for chunk in pending for s in chunk)}")
+
+        failed = []
+        with ThreadPoolExecutor(max_workers=min(workers, len(pending))) as executor:
+            futures = {executor.submit(tracing.bind(_request_chunk), chunk, attempt == 0): chunk for chunk in pending}
+            requests_sent += len(futures)
+
+            for future in as_completed(futures):
+                chunk = futures[future]
+                try:
+                    posts = future.result()
+                except Exception as e:
+                    print(f"   ❌ {', '.join(s['key'] for s in chunk)}: {e}")
+                    posts = {}
+
+                elapsed = time.perf_counter() - started
+                for store in chunk:
+                    post = posts.get(store['key'])
+                    if post:
+                        done[store['key']] = post
+                        print(f"   ✅ {store['key']} ({elapsed:.1f}초) {post['title'][:40]}")
+                    else:
+                        failed.append(store)
+
+        # 재시도는 1개씩 (묶음 전체를 다시 만들 필요 없음)
+        pending = [[store] for store in failed]
+
+    return {
+        'mode': f'parallel (chunk {chunk_size})',
+        'requests': requests_sent,
+        'posts': [done[s['key']] for s in stores if s['key'] in done],
+        'failed': [s['key'] for s in stores if s['key'] not in done],
+        'seconds': time.perf_counter() - started,
+    }
+
+
+# =========================
+# 리포트
+# =========================
+def print_report(reports):
+    print("\n" + "=" * 60)
+    print("📊 배치 생성 결과")
+    print("=" * 60)
+    for r in reports:
+        throughput = len(r['posts']) / r['seconds'] * 60 if r['seconds'] else 0.0
+        print(f"{r['mode']:20s} 요청 {r['requests']:2d}회 / 성공 {len(r['posts'])}/{len(STORES)} / "
+              f"{r['seconds']:6.1f}초 / {throughput:5.1f} 글/분")
+        if r['failed']:
+            print(f"{'':20s} ❌ 실패: {', '.join(r['failed'])}")
+
+
+def main():
+    tracing.start_run('batch')
+    mode = 'parallel'
+    chunk_size = 1
+    args = sys.argv[1:]
+    if '--mode' in args:
+        mode = args[args.index('--mode') + 1]
+    if '--chunk' in args:
+        chunk_size = int(args[args.index('--chunk') + 1])
+
+    reports = []
+    if mode in ('single', 'compare'):
+        reports.append(generate_all_posts_report())
+    if mode in ('parallel', 'compare'):
+        reports.append(generate_posts_parallel(chunk_size=chunk_size))
+
+    print_report(reports)
+    token_accounting.LEDGER.print_report()
+    token_accounting.LEDGER.write_report(f'batch_{mode}')
+
+    # 결과 저장 (마지막 방식 기준)
+    posts = reports[-1]['posts']
     if posts:
-        print("\n" + "=" * 60)
-        print("🎉 테스트 성공!")
-        print(f"총 {len(posts)}개 글 생성됨")
-        print("=" * 60)
-        
-        # 결과 저장
+        for i, post in enumerate(posts, 1):
+            print(f"[{i}/{len(posts)}] {post.get('store_key', 'Unknown')}")
+            print(f"   제목: {post.get('title', 'No title')[:50]}...")
+            print(f"   길이: {len(post.get('content', ''))} 자")
+
         with open('/tmp/batch_result.json', 'w', encoding='utf-8') as f:
             json.dump(posts, f, ensure_ascii=False, indent=2)
         print("📄 결과 저장: /tmp/batch_result.json")
+
+
+if __name__ == "__main__":
+    main()
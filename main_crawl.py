@@ -4,10 +4,16 @@
 """
 import os
 import json
-import requests
 from datetime import datetime
 from zoneinfo import ZoneInfo
 from crawler import ConvenienceStoreCrawler
+from catalog import ProductCatalog
+from config import CATALOG_DELTA, PRODUCTS_PER_POST
+import rate_limiter
+import llm_cache
+import llm_json
+import token_accounting
+import tracing
 
 # 환경변수
 GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
@@ -72,13 +78,14 @@ JSON 형식:
 {{"title": "제목", "content": "HTML 본문", "tags": ["일본편의점", "{name}"]}}
 """
     
-    print(f"  📝 AI 리뷰 생성 중... (프롬프트 길이: {len(prompt)} 자)")
+    print(f"  📝 AI 리뷰 생성 중... (프롬프트 약 {token_accounting.estimate_tokens(prompt)} 토큰)")
     
     try:
-        if AI_PROVIDER == 'GEMINI':
-            result = _call_gemini(prompt)
-        else:
-            result = _call_openai(prompt)
+        with token_accounting.store(store_key):
+            if AI_PROVIDER == 'GEMINI':
+                result = _call_gemini(prompt)
+            else:
+                result = _call_openai(prompt)
         
         if result:
             result['category'] = info['category']
@@ -95,9 +102,22 @@ JSON 형식:
     return None
 
 
+def _parse(result_text):
+    """깨진 JSON 은 로컬에서 복구 (title / content / tags 검사)"""
+    result, report = llm_json.load(result_text)
+    fixed = llm_json.describe(report)
+    if fixed:
+        print(f"  🩹 JSON 복구: {fixed}")
+    if report['missing']:
+        raise llm_json.InvalidJSON(f"필수 필드 없음: {', '.join(report['missing'])}")
+    return result
+
+
+@tracing.traced('call_gemini')
 def _call_gemini(prompt):
     """Gemini API 호출"""
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash-exp:generateContent?key={GEMINI_API_KEY}"
+    model = "gemini-2.0-flash-exp"
+    url = f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent?key={GEMINI_API_KEY}"
     
     data = {
         "contents": [{"parts": [{"text": prompt}]}],
@@ -108,13 +128,20 @@ def _call_gemini(prompt):
         }
     }
     
-    response = requests.post(url, json=data, timeout=90)
+    result_text = llm_cache.get('gemini', model, prompt, data['generationConfig'])
+    if result_text is not None:
+        return json.loads(result_text)
+    
+    response = rate_limiter.post('gemini', url, prompt, json=data, timeout=90)
     response.raise_for_status()
     
     result_text = response.json()['candidates'][0]['content']['parts'][0]['text']
-    return json.loads(result_text)
+    result = _parse(result_text)
+    llm_cache.put('gemini', model, prompt, data['generationConfig'], json.dumps(result, ensure_ascii=False))
+    return result
 
 
+@tracing.traced('call_openai')
 def _call_openai(prompt):
     """OpenAI API 호출"""
     headers = {"Authorization": f"Bearer {OPENAI_API_KEY}", "Content-Type": "application/json"}
@@ -129,11 +156,18 @@ def _call_openai(prompt):
         "response_format": {"type": "json_object"}
     }
     
-    response = requests.post("https://api.openai.com/v1/chat/completions", 
-                           headers=headers, json=data, timeout=90)
+    result_text = llm_cache.get('openai', data['model'], prompt, data)
+    if result_text is not None:
+        return json.loads(result_text)
+    
+    response = rate_limiter.post('openai', "https://api.openai.com/v1/chat/completions", prompt,
+                                 headers=headers, json=data, timeout=90)
     response.raise_for_status()
     
-    return json.loads(response.json()['choices'][0]['message']['content'])
+    result_text = response.json()['choices'][0]['message']['content']
+    result = _parse(result_text)
+    llm_cache.put('openai', data['model'], prompt, data, json.dumps(result, ensure_ascii=False))
+    return result
 
 
 def crawl_and_generate_all():
@@ -145,48 +179,48 @@ def crawl_and_generate_all():
     
     crawler = ConvenienceStoreCrawler()
     
-    # 크롤링 매핑
-    crawl_map = {
-        'GS25': lambda: crawler.crawl_gs25(),
-        'CU': lambda: crawler.crawl_cu(),
-        '세븐일레븐_한국': lambda: crawler.crawl_seven_eleven_kr(),
-        '세븐일레븐_일본': lambda: crawler.crawl_japan_store('세븐일레븐'),
-        '패밀리마트': lambda: crawler.crawl_japan_store('패밀리마트'),
-        '로손': lambda: crawler.crawl_japan_store('로손'),
-    }
+    # 1단계: 전체 편의점 동시 크롤링
+    print("\n🕷️ 제품 정보 크롤링...")
+    crawled = crawler.crawl_all()
+    catalog = ProductCatalog() if CATALOG_DELTA else None
     
     results = []
     
-    for store_key, crawl_func in crawl_map.items():
+    for store_key, products in crawled.items():
+        if token_accounting.LEDGER.exhausted():
+            print("\n⛔ 토큰 예산 소진 → 남은 편의점 건너뜀")
+            break
+        
         print(f"\n{'='*60}")
-        print(f"[{len(results)+1}/6] {store_key}")
+        print(f"[{len(results)+1}/{len(crawled)}] {store_key}")
         print(f"{'='*60}")
         
         try:
-            # 1단계: 크롤링
-            print("  🕷️ 제품 정보 크롤링...")
-            products = crawl_func()
-            
             if not products:
                 print("  ⚠️ 크롤링 실패, 건너뜀")
                 continue
             
-            print(f"  ✅ {len(products)}개 제품 수집:")
+            print(f"  ✅ {len(products)}개 제품 수집")
+            
+            # 2단계: 아직 리뷰 안 한 제품만 추리기
+            if catalog:
+                products = catalog.sync(store_key, products)
+                if not products:
+                    print("  ⏭️ 새 제품 없음, AI 호출 건너뜀")
+                    continue
+            products = products[:PRODUCTS_PER_POST]
+            
             for p in products:
                 print(f"     - {p['name']} ({p['price']})")
             
-            # 2단계: AI 리뷰 생성
+            # 3단계: AI 리뷰 생성
             result = generate_review_with_real_products(store_key, products)
             
             if result:
                 results.append(result)
+                if catalog:
+                    catalog.mark_reviewed(store_key, products)
                 print(f"  💾 저장 완료 (총 {len(results)}개)")
-            
-            # Rate Limit 방지
-            if len(results) < 6:
-                print("  ⏱️ 30초 대기...")
-                import time
-                time.sleep(30)
         
         except Exception as e:
             print(f"  ❌ 에러: {e}")
@@ -202,6 +236,10 @@ def crawl_and_generate_all():
     for i, r in enumerate(results, 1):
         print(f"[{i}] {r['store_key']}: {r['title'][:50]}...")
     
+    print(crawler.http.summary_line())
+    token_accounting.LEDGER.print_report()
+    token_accounting.LEDGER.write_report('crawl')
+    
     return results
 
 
@@ -209,6 +247,8 @@ def crawl_and_generate_all():
 # 테스트
 # ========================================
 if __name__ == "__main__":
+    tracing.start_run('crawl')
+    
     # 전체 크롤링 + 생성
     results = crawl_and_generate_all()
     
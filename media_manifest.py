@@ -0,0 +1,68 @@
+"""
+워드프레스 미디어 업로드 기록 (중복 업로드 방지)
+- 파일 내용 sha256 → 워드프레스 media id / url
+- .cache/wp_media.json 에 저장 (actions/cache 로 다음 실행에도 유지)
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+
+from config import CACHE_DIR
+
+MANIFEST_PATH = os.path.join(CACHE_DIR, 'wp_media.json')
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class MediaManifest:
+    def __init__(self, path=MANIFEST_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"  ⚠️ 미디어 기록 파일 읽기 실패 (초기화): {e}")
+            return {}
+
+    def _save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"  ⚠️ 미디어 기록 저장 실패: {e}")
+
+    def lookup(self, content_hash):
+        with self.lock:
+            return self.entries.get(content_hash)
+
+    def record(self, content_hash, media_id, url, name):
+        with self.lock:
+            self.entries[content_hash] = {
+                'id': media_id,
+                'url': url,
+                'name': name,
+                'uploaded_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            }
+            self._save()
+
+    def forget(self, content_hash):
+        with self.lock:
+            if self.entries.pop(content_hash, None):
+                self._save()
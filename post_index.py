@@ -0,0 +1,160 @@
+"""
+예약 글(posts/*.md) 날짜 인덱스 (SQLite)
+- 파일 경로 → publish_date / 제목 / mtime / 내용 해시 / 발행 시각
+- refresh(): 파일 목록은 stat 만, mtime/크기가 바뀐 파일만 내용 해시(sha256) 계산
+  → 해시까지 같으면 mtime 만 갱신 (actions/checkout 은 매번 mtime 을 새로 찍음)
+  → 해시가 다른(새로 생겼거나 수정된) 파일만 front matter 헤더를 다시 읽고 다시 발행 대상으로
+- due(날짜): 그 날짜에 발행할, 아직 발행 안 한 글만
+→ 아카이브가 아무리 커져도 YAML 을 다시 읽는 건 바뀐 글뿐
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, datetime
+
+import yaml
+
+from config import CACHE_DIR
+
+DB_PATH = os.path.join(CACHE_DIR, 'post_index.sqlite')
+
+
+def file_hash(path):
+    """파일 내용 sha256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_front_matter(path):
+    """맨 위 '---' ~ '---' 헤더만 읽어서 dict (헤더 없으면 빈 dict)"""
+    with open(path, encoding='utf-8') as f:
+        if f.readline().strip() != '---':
+            return {}
+        lines = []
+        for line in f:
+            if line.strip() == '---':
+                break
+            lines.append(line)
+    meta = yaml.safe_load("".join(lines))
+    return meta if isinstance(meta, dict) else {}
+
+
+def normalize_date(value):
+    """YAML 이 date 로 읽은 값 / 문자열 → 'YYYY-MM-DD' (없으면 None)"""
+    if isinstance(value, (datetime, date)):
+        return value.strftime('%Y-%m-%d')
+    if value:
+        return str(value).strip()[:10]
+    return None
+
+
+class PostIndex:
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS posts (
+                path TEXT PRIMARY KEY,
+                mtime REAL,
+                size INTEGER,
+                publish_date TEXT,
+                title TEXT,
+                published_at REAL
+            )
+        """)
+        self.db.execute("CREATE INDEX IF NOT EXISTS posts_by_date ON posts (publish_date, published_at)")
+        # 예전 인덱스 파일(Actions 캐시)에는 content_hash 가 없음 → 비어 있으면 첫 refresh 때 채움
+        columns = [row[1] for row in self.db.execute("PRAGMA table_info(posts)")]
+        if 'content_hash' not in columns:
+            self.db.execute("ALTER TABLE posts ADD COLUMN content_hash TEXT")
+        self.db.commit()
+
+    def refresh(self, posts_dir):
+        """posts_dir 의 *.md 와 인덱스 맞추기 → {'files', 'hashed', 'reread', 'removed'}"""
+        stats = {'files': 0, 'hashed': 0, 'reread': 0, 'removed': 0}
+        on_disk = {}
+        try:
+            with os.scandir(posts_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith('.md') and entry.is_file():
+                        st = entry.stat()
+                        on_disk[os.path.join(posts_dir, entry.name)] = (st.st_mtime, st.st_size)
+        except FileNotFoundError:
+            pass
+        stats['files'] = len(on_disk)
+
+        with self.lock:
+            known = {
+                path: (mtime, size, hash_)
+                for path, mtime, size, hash_ in self.db.execute("SELECT path, mtime, size, content_hash FROM posts")
+            }
+
+            for path in known.keys() - on_disk.keys():
+                self.db.execute("DELETE FROM posts WHERE path = ?", (path,))
+                stats['removed'] += 1
+
+            for path, (mtime, size) in on_disk.items():
+                old = known.get(path)
+                if old and old[:2] == (mtime, size) and old[2]:
+                    continue
+                try:
+                    hash_ = file_hash(path)
+                except OSError as e:
+                    print(f"⚠️ 파일 읽기 실패 ({path}): {e}")
+                    continue
+                stats['hashed'] += 1
+                if old and old[2] == hash_:
+                    # 내용은 그대로 (체크아웃으로 mtime 만 바뀜) → 헤더 안 읽고 발행 여부 유지
+                    self.db.execute("UPDATE posts SET mtime = ?, size = ? WHERE path = ?", (mtime, size, path))
+                    continue
+                try:
+                    meta = read_front_matter(path)
+                except Exception as e:
+                    print(f"⚠️ front matter 읽기 실패 ({path}): {e}")
+                    meta = {}
+                if old and old[2] is None:
+                    # 해시 칸을 처음 채우는 예전 인덱스 → 내용이 바뀌었는지 모르니 발행 여부는 유지
+                    self.db.execute(
+                        "UPDATE posts SET mtime = ?, size = ?, publish_date = ?, title = ?, content_hash = ? WHERE path = ?",
+                        (mtime, size, normalize_date(meta.get('publish_date')),
+                         str(meta.get('title') or os.path.basename(path)), hash_, path),
+                    )
+                else:
+                    # 새 글 / 내용이 바뀐 글은 다시 발행 대상
+                    # (이미 올린 글이면 publish_scheduled 가 발행 기록의 post id 로 EditPost)
+                    self.db.execute(
+                        "INSERT OR REPLACE INTO posts (path, mtime, size, publish_date, title, published_at, content_hash) "
+                        "VALUES (?, ?, ?, ?, ?, NULL, ?)",
+                        (path, mtime, size, normalize_date(meta.get('publish_date')),
+                         str(meta.get('title') or os.path.basename(path)), hash_),
+                    )
+                stats['reread'] += 1
+            self.db.commit()
+        return stats
+
+    def due(self, publish_date):
+        """그 날짜에 발행할 글 중 아직 발행 안 한 것 → [(path, title)]"""
+        with self.lock:
+            return self.db.execute(
+                "SELECT path, title FROM posts WHERE publish_date = ? AND published_at IS NULL ORDER BY path",
+                (publish_date,),
+            ).fetchall()
+
+    def mark_published(self, path):
+        with self.lock:
+            self.db.execute("UPDATE posts SET published_at = ? WHERE path = ?", (time.time(), path))
+            self.db.commit()
+
+    def counts(self):
+        with self.lock:
+            total, published = self.db.execute(
+                "SELECT COUNT(*), COUNT(published_at) FROM posts"
+            ).fetchone()
+        return {'total': total, 'published': published}
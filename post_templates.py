@@ -0,0 +1,200 @@
+"""
+블로그 본문 HTML 템플릿 (한국 / 일본 편의점)
+- 예전엔 이 HTML 을 프롬프트에 통째로 넣고 AI 가 그대로 다시 써서 돌려줌 → 양방향으로 수천 토큰
+- 이제 AI 는 제품별 필드(JSON)만 주고, 본문은 여기서 string.Template 으로 조립
+- 템플릿은 import 할 때 한번만 만들어 둠
+"""
+import html
+import re
+from string import Template
+
+import tracing
+
+# =========================
+# 한국 편의점
+# =========================
+KR_PAGE = Template("""<div style="max-width: 800px;margin: 0 auto;font-family: 'Malgun Gothic', sans-serif">
+
+<!-- 헤더 -->
+<div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);padding: 40px 30px;border-radius: 20px;margin-bottom: 40px;text-align: center;box-shadow: 0 10px 30px rgba(0,0,0,0.2)">
+<h1 style="color: white;font-size: 28px;margin: 0 0 15px 0;font-weight: bold">🛒 $name 신상 제품 리뷰!</h1>
+<p style="color: rgba(255,255,255,0.9);font-size: 16px;margin: 0">コンビニ新商品レビュー 🇰🇷🇯🇵</p>
+</div>
+
+<!-- 인사말 -->
+<div style="background: #f8f9ff;padding: 30px;border-radius: 15px;margin-bottom: 40px;border-left: 5px solid #667eea">
+<p style="font-size: 17px;line-height: 1.8;margin: 0;color: #222;font-weight: 500">
+<strong style="font-size: 19px">안녕하세요, 편스타그램 친구들!</strong> 오늘은 $name에서 새롭게 나온 신상 제품들을 소개해드릴게요! 🎉 $greeting
+</p>
+</div>
+
+$products
+
+<!-- 마무리 -->
+<div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);padding: 35px;border-radius: 20px;margin-bottom: 40px;text-align: center;box-shadow: 0 10px 30px rgba(0,0,0,0.2)">
+<p style="color: white;font-size: 18px;line-height: 1.8;margin: 0">
+오늘 소개해드린 $name 신상 제품들, 어떠셨나요? 가성비도 좋고 맛있으니 꼭 한 번 드셔보세요! 여러분의 편의점 꿀조합도 댓글로 남겨주세요! 😊<br><br>
+<span style="font-size: 16px;opacity: 0.9">今日紹介した${name}の新商品、ぜひ試してみてください！🎌</span>
+</p>
+</div>
+
+<!-- 해시태그 -->
+<hr style="border: none;border-top: 3px solid #667eea;margin: 50px 0 30px 0">
+
+<div style="background: linear-gradient(to right, #f8f9ff, #fff5f8);padding: 30px;border-radius: 15px;text-align: center">
+<p style="margin: 0 0 15px 0;font-size: 16px;color: #667eea;font-weight: bold">📱 해시태그 / ハッシュタグ</p>
+<p style="margin: 0;font-size: 15px;color: #667eea;line-height: 2">
+#편의점신상 #コンビニ新商品 #$name #꿀조합 #美味しい組み合わせ #편스타그램 #コンビニグルメ #MZ추천 #韓国コンビニ #편의점디저트 #コンビニデザート
+</p>
+</div>
+
+</div>""")
+
+KR_PRODUCT = Template("""<!-- 제품 $index -->
+<div style="background: white;padding: 35px;border-radius: 20px;margin-bottom: 35px;box-shadow: 0 5px 20px rgba(0,0,0,0.08);border: 2px solid #f0f0f0">
+<h2 style="color: #667eea;font-size: 26px;margin: 0 0 20px 0;font-weight: bold;border-bottom: 3px solid #667eea;padding-bottom: 15px">$index. $name $emoji</h2>
+
+<div style="background: #fff5f5;padding: 20px;border-radius: 12px;margin-bottom: 20px">
+<p style="font-size: 18px;margin: 0;color: #e63946"><strong style="font-size: 22px">💰 가격: ${price}원</strong></p>
+</div>
+
+<p style="font-size: 16px;line-height: 1.9;color: #222;margin-bottom: 20px;font-weight: 500">
+$review
+</p>
+
+<div style="background: #e8f5e9;padding: 18px;border-radius: 10px;margin-bottom: 20px">
+<p style="font-size: 16px;margin: 0;color: #2e7d32"><strong>🍯 꿀조합:</strong> $combo</p>
+</div>
+
+<p style="font-size: 17px;margin-bottom: 20px"><strong>별점:</strong> $stars</p>
+
+<div style="background: linear-gradient(to right, #fff3e0, #ffe0b2);padding: 20px;border-radius: 12px;border-left: 4px solid #ff9800">
+<p style="margin: 0 0 8px 0;font-size: 15px;color: #e65100"><strong>🇯🇵 日本語要約</strong></p>
+<p style="font-size: 14px;line-height: 1.7;color: #555;margin: 0">$summary_jp</p>
+</div>
+</div>""")
+
+# =========================
+# 일본 편의점
+# =========================
+JP_PAGE = Template("""<div style="max-width: 800px;margin: 0 auto;font-family: 'Malgun Gothic', sans-serif">
+
+<!-- 헤더 -->
+<div style="background: linear-gradient(135deg, #ff6b6b 0%, #ee5a6f 100%);padding: 40px 30px;border-radius: 20px;margin-bottom: 40px;text-align: center;box-shadow: 0 10px 30px rgba(0,0,0,0.2)">
+<h1 style="color: white;font-size: 28px;margin: 0 0 15px 0;font-weight: bold">🇯🇵 $name 신상 제품 리뷰!</h1>
+<p style="color: rgba(255,255,255,0.9);font-size: 18px;margin: 0">$name_jp 新商品レビュー</p>
+</div>
+
+<!-- 인사말 -->
+<div style="background: #fff5f5;padding: 30px;border-radius: 15px;margin-bottom: 40px;border-left: 5px solid #ff6b6b">
+<p style="font-size: 17px;line-height: 1.8;margin: 0;color: #222;font-weight: 500">
+<strong style="font-size: 19px">안녕하세요! 일본 편의점 탐험대입니다!</strong> 🇯🇵 오늘은 일본 ${name}의 신상 제품을 소개해드릴게요! $greeting
+</p>
+</div>
+
+$products
+
+<!-- 마무리 -->
+<div style="background: linear-gradient(135deg, #ff6b6b 0%, #ee5a6f 100%);padding: 35px;border-radius: 20px;margin-bottom: 40px;text-align: center;box-shadow: 0 10px 30px rgba(0,0,0,0.2)">
+<p style="color: white;font-size: 18px;line-height: 1.8;margin: 0">
+일본 여행 가시면 $name 꼭 들러보세요! 한국에서는 맛볼 수 없는 특별한 제품들이 가득해요! 🎌<br><br>
+<span style="font-size: 16px;opacity: 0.9">日本旅行の際は、ぜひ${name_jp}に立ち寄ってみてください！</span>
+</p>
+</div>
+
+<!-- 해시태그 -->
+<hr style="border: none;border-top: 3px solid #ff6b6b;margin: 50px 0 30px 0">
+
+<div style="background: linear-gradient(to right, #fff5f5, #ffe0e0);padding: 30px;border-radius: 15px;text-align: center">
+<p style="margin: 0 0 15px 0;font-size: 16px;color: #ff6b6b;font-weight: bold">📱 해시태그 / ハッシュタグ</p>
+<p style="margin: 0;font-size: 15px;color: #ff6b6b;line-height: 2">
+#일본편의점 #日本コンビニ #$name #$name_jp #일본여행 #日本旅行 #편의점투어 #コンビニ巡り
+</p>
+</div>
+
+</div>""")
+
+JP_PRODUCT = Template("""<!-- 제품 $index -->
+<div style="background: white;padding: 35px;border-radius: 20px;margin-bottom: 35px;box-shadow: 0 5px 20px rgba(0,0,0,0.08);border: 2px solid #f0f0f0">
+<h2 style="color: #ff6b6b;font-size: 26px;margin: 0 0 20px 0;font-weight: bold;border-bottom: 3px solid #ff6b6b;padding-bottom: 15px">$index. $name ($name_jp) $emoji</h2>
+
+<div style="background: #fff5f5;padding: 20px;border-radius: 12px;margin-bottom: 20px">
+<p style="font-size: 18px;margin: 0;color: #e63946"><strong style="font-size: 22px">💴 가격: ${price}엔</strong></p>
+</div>
+
+<p style="font-size: 16px;line-height: 1.9;color: #222;margin-bottom: 20px;font-weight: 500">
+$review
+</p>
+
+<div style="background: #fff3cd;padding: 18px;border-radius: 10px;margin-bottom: 20px;border-left: 4px solid #ffc107">
+<p style="font-size: 16px;margin: 0;color: #856404"><strong>🎌 일본 팁:</strong> $tip</p>
+</div>
+
+<p style="font-size: 17px;margin-bottom: 20px"><strong>별점:</strong> $stars</p>
+</div>""")
+
+# AI 응답 스키마 (llm_json 검증용) - content 는 여기서 만들기 때문에 없음
+POST_SCHEMA = {'title': str, 'tags': list, 'products': list}
+
+# AI 가 채울 필드 (프롬프트에 그대로 보여줌)
+KR_PRODUCT_FIELDS = '{"name": "제품명", "emoji": "이모지 1개", "price": "가격 숫자", "review": "맛 후기 (식감, 맛, 향 구체적으로)", "combo": "꿀조합 설명", "rating": 1~5, "summary_jp": "일본어 요약 3-4줄"}'
+JP_PRODUCT_FIELDS = '{"name": "제품명(한국어)", "name_jp": "제품명(일본어)", "emoji": "이모지 1개", "price": "가격 숫자", "review": "맛 후기 (한국과 비교하며)", "tip": "일본 편의점 문화 팁", "rating": 1~5}'
+
+_PRICE_CHARS = re.compile(r'[^\d,.]')
+
+
+def _text(value):
+    """AI 가 준 값 → HTML 에 넣을 안전한 텍스트"""
+    return html.escape(str(value or '').strip())
+
+
+def _price(value):
+    """'3,500원' / '3500' / 3500 → '3,500' (숫자가 없으면 그대로)"""
+    text = str(value or '').strip()
+    digits = _PRICE_CHARS.sub('', text)
+    return html.escape(digits or text)
+
+
+def _stars(value):
+    try:
+        rating = round(float(value))
+    except (TypeError, ValueError):
+        rating = 5
+    return '⭐' * min(5, max(1, rating))
+
+
+@tracing.traced()
+def render_post(store_info, post):
+    """
+    AI 가 준 {"greeting", "products": [...]} + 편의점 정보 → 본문 HTML
+    제품이 하나도 없으면 None
+    """
+    products = [p for p in post.get('products') or [] if isinstance(p, dict) and p.get('name')]
+    if not products:
+        return None
+
+    name = _text(store_info['name'])
+    name_jp = _text(store_info.get('name_jp', store_info['name']))
+    product_template, page_template = (KR_PRODUCT, KR_PAGE) if store_info['country'] == 'kr' else (JP_PRODUCT, JP_PAGE)
+
+    blocks = []
+    for index, product in enumerate(products, 1):
+        blocks.append(product_template.substitute(
+            index=index,
+            name=_text(product.get('name')),
+            name_jp=_text(product.get('name_jp')),
+            emoji=_text(product.get('emoji')),
+            price=_price(product.get('price')),
+            review=_text(product.get('review')),
+            combo=_text(product.get('combo')),
+            tip=_text(product.get('tip')),
+            stars=_stars(product.get('rating')),
+            summary_jp=_text(product.get('summary_jp')),
+        ))
+
+    return page_template.substitute(
+        name=name,
+        name_jp=name_jp,
+        greeting=_text(post.get('greeting')),
+        products="\n\n".join(blocks),
+    )
@@ -0,0 +1,132 @@
+"""
+AI 프로바이더별 성적표
+- 호출 수 / 성공 / 실패 / 헤지 경주 승리 / 취소 / JSON 복구 횟수
+- 최근 지연시간으로 p50 / p95 계산 (헤지 시작 시점 자동 조정용)
+- 지연시간 샘플은 .cache/provider_stats.json 에 저장해서 다음 크론 실행도 이어받음
+  (실행 1번에 프로바이더당 호출이 몇 번 안 돼서 저장 안 하면 MIN_SAMPLES 를 못 채움)
+- 횟수(호출 / 승리 ...)는 이번 실행 것만
+"""
+import json
+import os
+import threading
+from collections import deque
+
+from config import CACHE_DIR
+
+STATE_PATH = os.path.join(CACHE_DIR, 'provider_stats.json')
+
+# p95 계산에 쓰는 최근 샘플 수
+WINDOW = 50
+
+# 이 정도는 쌓여야 p95 를 믿음
+MIN_SAMPLES = 5
+
+
+class ProviderStats:
+    def __init__(self, path=STATE_PATH, window=WINDOW):
+        self.path = path
+        self.window = window
+        self.lock = threading.Lock()
+        self.stats = {}
+        for provider, samples in self._load().items():
+            self._entry(provider)['latencies'].extend(samples)
+
+    def _load(self):
+        """저장된 {프로바이더: [지연시간 ...]} (없거나 깨졌으면 빈 dict)"""
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"  ⚠️ 프로바이더 지연시간 파일 읽기 실패 (초기화): {e}")
+            return {}
+
+    def _save(self):
+        """lock 잡은 상태에서 호출"""
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({name: list(entry['latencies']) for name, entry in self.stats.items()}, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"  ⚠️ 프로바이더 지연시간 저장 실패: {e}")
+
+    def _entry(self, provider):
+        if provider not in self.stats:
+            self.stats[provider] = {
+                'calls': 0,
+                'ok': 0,
+                'failed': 0,
+                'wins': 0,
+                'cancelled': 0,
+                'repaired': 0,
+                'latencies': deque(maxlen=self.window),
+            }
+        return self.stats[provider]
+
+    def record(self, provider, latency, ok):
+        """호출 1번 결과 기록 (성공한 호출만 지연시간 샘플로 사용)"""
+        with self.lock:
+            entry = self._entry(provider)
+            entry['calls'] += 1
+            if ok:
+                entry['ok'] += 1
+                entry['latencies'].append(latency)
+                self._save()
+            else:
+                entry['failed'] += 1
+
+    def record_win(self, provider):
+        with self.lock:
+            self._entry(provider)['wins'] += 1
+
+    def record_cancelled(self, provider):
+        with self.lock:
+            self._entry(provider)['cancelled'] += 1
+
+    def record_repaired(self, provider):
+        """깨진 JSON 을 고쳐서 살린 횟수 (복구 못 했으면 다음 프로바이더로 넘어갔을 호출)"""
+        with self.lock:
+            self._entry(provider)['repaired'] += 1
+
+    def percentile(self, provider, pct):
+        """최근 성공 지연시간의 pct 분위수 (샘플 부족하면 None)"""
+        with self.lock:
+            samples = sorted(self._entry(provider)['latencies'])
+        if len(samples) < MIN_SAMPLES:
+            return None
+        index = min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))
+        return samples[index]
+
+    def p95(self, provider):
+        return self.percentile(provider, 95)
+
+    def snapshot(self):
+        """튜닝용 요약 dict (JSON 으로 바로 저장 가능)"""
+        with self.lock:
+            providers = list(self.stats)
+            counts = {
+                name: {k: v for k, v in self.stats[name].items() if k != 'latencies'}
+                for name in providers
+            }
+        for name in providers:
+            counts[name]['p50'] = self.percentile(name, 50)
+            counts[name]['p95'] = self.p95(name)
+        return counts
+
+    def print_summary(self):
+        snapshot = self.snapshot()
+        if not snapshot:
+            return
+        print("📊 AI 프로바이더 성적표:")
+        for name, s in snapshot.items():
+            p50 = f"{s['p50']:.1f}s" if s['p50'] is not None else '-'
+            p95 = f"{s['p95']:.1f}s" if s['p95'] is not None else '-'
+            print(f"   - {name}: 호출 {s['calls']} / 성공 {s['ok']} / 실패 {s['failed']} / "
+                  f"승리 {s['wins']} / 취소 {s['cancelled']} / 복구 {s['repaired']} / p50 {p50} / p95 {p95}")
+
+
+# 프로세스 전체에서 공유
+STATS = ProviderStats()
@@ -0,0 +1,117 @@
+"""
+발행 기록 (SQLite) - 다시 실행해도 같은 글을 두 번 만들거나 올리지 않도록
+- (편의점, 예약 슬롯) 마다 어디까지 했는지(step) + 생성한 글 + 내용 해시 + 워드프레스 post id
+- step: generated(AI 생성 끝) → image_ready(이미지 업로드 끝) → publishing(NewPost 보내기 직전)
+  → published(NewPost 끝, 글마다 결과가 나오는 즉시)
+- 중간에 죽고 다시 돌리면 끝난 단계는 건너뛰고 다음 단계부터
+  (publishing 에서 끝난 글은 워드프레스에 이미 올라갔는지 먼저 확인)
+- 파일은 CACHE_DIR(.cache) 안 → GitHub Actions 에서는 Actions 캐시로 유지
+  (워크플로우가 실패한 실행에서도 캐시를 저장해야 재실행 때 이어짐: cache/save 가 if: always())
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from config import CACHE_DIR
+
+DB_PATH = os.path.join(CACHE_DIR, 'publish_ledger.sqlite')
+
+GENERATED = 'generated'
+IMAGE_READY = 'image_ready'
+PUBLISHING = 'publishing'
+PUBLISHED = 'published'
+
+
+def content_hash(content):
+    """글 dict / 문자열 → sha256 (dict 는 키 정렬해서)"""
+    if not isinstance(content, str):
+        content = json.dumps(content, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def _slot_key(slot):
+    return slot.isoformat() if hasattr(slot, 'isoformat') else str(slot)
+
+
+class PublishLedger:
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                store TEXT,
+                slot TEXT,
+                step TEXT,
+                content_hash TEXT,
+                content TEXT,
+                image_html TEXT,
+                post_id TEXT,
+                url TEXT,
+                updated_at REAL,
+                PRIMARY KEY (store, slot)
+            )
+        """)
+        self.db.commit()
+
+    def get(self, store, slot):
+        """기록 dict (content 는 dict 로 풀어서) / 없으면 None"""
+        with self.lock:
+            row = self.db.execute(
+                "SELECT * FROM entries WHERE store = ? AND slot = ?", (store, _slot_key(slot))
+            ).fetchone()
+        if row is None:
+            return None
+        entry = dict(row)
+        entry['content'] = json.loads(entry['content']) if entry['content'] else None
+        return entry
+
+    def record_generated(self, store, slot, content):
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO entries (store, slot, step, content_hash, content, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (store, _slot_key(slot), GENERATED, content_hash(content),
+                 json.dumps(content, ensure_ascii=False), time.time()),
+            )
+            self.db.commit()
+
+    def record_image(self, store, slot, image_html):
+        with self.lock:
+            self.db.execute(
+                "UPDATE entries SET step = ?, image_html = ?, updated_at = ? WHERE store = ? AND slot = ?",
+                (IMAGE_READY, image_html, time.time(), store, _slot_key(slot)),
+            )
+            self.db.commit()
+
+    def record_publishing(self, store, slot):
+        """NewPost 보내기 직전 (이 상태로 남아 있으면 올라갔는지 모르는 글)"""
+        with self.lock:
+            self.db.execute(
+                "UPDATE entries SET step = ?, updated_at = ? WHERE store = ? AND slot = ?",
+                (PUBLISHING, time.time(), store, _slot_key(slot)),
+            )
+            self.db.commit()
+
+    def record_published(self, store, slot, post_id, url, hash_=None):
+        """NewPost 성공 기록 (앞 단계 기록이 없던 글이면 새로 만듦)"""
+        with self.lock:
+            self.db.execute(
+                "INSERT INTO entries (store, slot, step, content_hash, post_id, url, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (store, slot) DO UPDATE SET step = excluded.step, post_id = excluded.post_id, "
+                "url = excluded.url, updated_at = excluded.updated_at, "
+                "content_hash = COALESCE(excluded.content_hash, content_hash)",
+                (store, _slot_key(slot), PUBLISHED, hash_, str(post_id), url, time.time()),
+            )
+            self.db.commit()
+
+    def counts(self):
+        """step 별 개수"""
+        with self.lock:
+            return dict(self.db.execute("SELECT step, COUNT(*) FROM entries GROUP BY step").fetchall())
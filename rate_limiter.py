@@ -0,0 +1,228 @@
+"""
+AI 프로바이더별 속도 제한 (토큰 버킷)
+- 프로바이더마다 RPM(분당 요청) / TPM(분당 토큰) 버킷 2개
+- 버킷에 여유가 있으면 바로 통과, 모자랄 때만 필요한 만큼만 대기
+- 429 응답 / Retry-After 헤더를 받으면 그만큼 막고 속도를 낮췄다가 성공하면 천천히 회복
+"""
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+
+import token_accounting
+from config import RATE_LIMITS
+from token_accounting import estimate_tokens
+
+# 응답 길이를 모를 때 미리 잡아두는 출력 토큰 수
+DEFAULT_COMPLETION_TOKENS = 2000
+
+# 429 이후 속도 조절 (AIMD)
+MIN_RATE_FACTOR = 0.25
+BACKOFF_FACTOR = 0.5
+RECOVERY_STEP = 0.1
+
+
+class TokenBucket:
+    """capacity 만큼 담기고 60초에 걸쳐 다시 차는 버킷"""
+
+    def __init__(self, capacity, period=60.0):
+        self.capacity = float(capacity)
+        self.period = period
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def refill(self, now, factor=1.0):
+        rate = self.capacity / self.period * factor
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+
+    def wait_time(self, amount, factor=1.0):
+        """amount 만큼 꺼내려면 몇 초 기다려야 하는지"""
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        rate = self.capacity / self.period * factor
+        return (amount - self.tokens) / rate
+
+    def take(self, amount):
+        self.tokens -= min(amount, self.capacity)
+
+    def give_back(self, amount):
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class ProviderLimiter:
+    """프로바이더 1개의 RPM/TPM 제한 + 429 피드백"""
+
+    def __init__(self, name, rpm, tpm):
+        self.name = name
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.factor = 1.0          # 429 받으면 줄어드는 속도 배율
+        self.blocked_until = 0.0   # Retry-After 로 막힌 시각 (monotonic)
+        self.lock = threading.Lock()
+
+    def acquire(self, tokens):
+        """버킷에서 요청 1개 + tokens 만큼 꺼냄 (모자라면 필요한 만큼만 대기)"""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.requests.refill(now, self.factor)
+                self.tokens.refill(now, self.factor)
+                wait = max(
+                    self.blocked_until - now,
+                    self.requests.wait_time(1, self.factor),
+                    self.tokens.wait_time(tokens, self.factor),
+                )
+                if wait <= 0:
+                    self.requests.take(1)
+                    self.tokens.take(tokens)
+                    if waited > 0:
+                        print(f"  ⏱️ {self.name} 속도 제한으로 {waited:.1f}초 대기")
+                    return waited
+            time.sleep(wait)
+            waited += wait
+
+    def settle(self, reserved, actual):
+        """미리 잡아둔 토큰과 실제 사용량 차이 정산"""
+        if actual is None:
+            return
+        with self.lock:
+            diff = reserved - actual
+            if diff > 0:
+                self.tokens.give_back(diff)
+            else:
+                self.tokens.take(-diff)
+
+    def on_success(self):
+        with self.lock:
+            self.factor = min(1.0, self.factor + RECOVERY_STEP)
+
+    def on_rate_limited(self, retry_after=None):
+        """429: Retry-After 동안 막고, 속도 배율 절반으로"""
+        with self.lock:
+            self.factor = max(MIN_RATE_FACTOR, self.factor * BACKOFF_FACTOR)
+            if retry_after is None:
+                # 헤더가 없으면 요청 1개가 다시 찰 때까지
+                retry_after = self.requests.period / (self.requests.capacity * self.factor)
+            self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+            self.requests.tokens = 0.0
+        print(f"  🚦 {self.name} 429 → {retry_after:.1f}초 쉬고 속도 {self.factor:.0%}로 조절")
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(provider):
+    with _limiters_lock:
+        if provider not in _limiters:
+            limits = RATE_LIMITS.get(provider, {'rpm': 60, 'tpm': 1000000})
+            _limiters[provider] = ProviderLimiter(provider, limits['rpm'], limits['tpm'])
+        return _limiters[provider]
+
+
+def parse_retry_after(response):
+    """Retry-After 헤더(초 또는 HTTP 날짜) / Gemini retryDelay 파싱"""
+    value = response.headers.get('Retry-After')
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+            except Exception:
+                pass
+
+    # Gemini: {"error": {"details": [{"retryDelay": "30s"}]}}
+    try:
+        for detail in response.json().get('error', {}).get('details', []):
+            delay = detail.get('retryDelay')
+            if delay and delay.endswith('s'):
+                return float(delay[:-1])
+    except Exception:
+        pass
+    return None
+
+
+def _json_or_none(response):
+    try:
+        return response.json()
+    except Exception:
+        return None
+
+
+def post(provider, url, prompt, retries=2, completion_tokens=DEFAULT_COMPLETION_TOKENS, **kwargs):
+    """
+    속도 제한 + 토큰 예산을 지키면서 requests.post
+    - 429 면 limiter 에 알려주고 retries 번까지 다시 시도
+    - 마지막 응답을 그대로 리턴 (raise_for_status 는 호출하는 쪽에서)
+    - 예산을 넘으면 요청 안 보내고 token_accounting.BudgetExceeded
+    - 대기 / 전송 중 예외면 잡아둔 토큰 예산 예약 해제 + TPM 버킷에 돌려주고 그대로 다시 던짐
+    """
+    limiter = get_limiter(provider)
+    ledger = token_accounting.LEDGER
+    prompt_estimate = estimate_tokens(prompt)
+    reserved = prompt_estimate + completion_tokens
+    model = token_accounting.model_from_request(url, kwargs.get('json'))
+
+    for attempt in range(retries + 1):
+        ledger.reserve(reserved)
+        try:
+            limiter.acquire(reserved)
+        except BaseException:
+            # 버킷에서 꺼내기 전에 멈춤 (acquire 는 꺼낼 때만 차감) → 예산 예약만 해제
+            ledger.release(reserved)
+            raise
+        started = time.monotonic()
+        try:
+            response = requests.post(url, **kwargs)
+        except BaseException:
+            # 연결 실패 / 타임아웃 등 응답을 못 받음 → 사용량 없음으로 보고 둘 다 되돌림
+            limiter.settle(reserved, 0)
+            ledger.release(reserved)
+            raise
+
+        if response.status_code == 429:
+            limiter.settle(reserved, 0)
+            ledger.record(provider, model, reserved, prompt_estimate, None, time.monotonic() - started, ok=False)
+            limiter.on_rate_limited(parse_retry_after(response))
+            if attempt < retries:
+                continue
+            return response
+
+        if response.ok:
+            limiter.on_success()
+        # 스트리밍이면 본문을 아직 안 읽었으니 정산은 settle() 로 나중에
+        if not kwargs.get('stream'):
+            usage = token_accounting.usage_from_json(_json_or_none(response)) if response.ok else None
+            limiter.settle(reserved, usage['total'] if usage else None)
+            ledger.record(provider, model, reserved, prompt_estimate, usage,
+                          time.monotonic() - started, ok=response.ok)
+        elif not response.ok:
+            ledger.record(provider, model, reserved, prompt_estimate, None, time.monotonic() - started, ok=False)
+        return response
+
+
+def settle(provider, url, payload, prompt, usage, latency, ok=True, completion_tokens=DEFAULT_COMPLETION_TOKENS,
+           cancelled=False, streamed_text=None):
+    """
+    스트리밍 응답이 끝난 뒤 정산 (post 에서 잡아둔 만큼 기준)
+    usage: token_accounting.usage_from_json 형식 / 모르면 None
+    cancelled: 중간에 끊은 응답 → 사용량을 못 받았으면 프롬프트 + 받은 텍스트(streamed_text) 추정치로 정산
+    """
+    prompt_estimate = estimate_tokens(prompt)
+    reserved = prompt_estimate + completion_tokens
+    completion_estimate = estimate_tokens(streamed_text) if cancelled and not usage else 0
+    if usage:
+        actual = usage['total']
+    elif cancelled:
+        actual = prompt_estimate + completion_estimate
+    else:
+        actual = None
+    get_limiter(provider).settle(reserved, actual)
+    model = token_accounting.model_from_request(url, payload)
+    token_accounting.LEDGER.record(provider, model, reserved, prompt_estimate, usage, latency, ok=ok,
+                                   cancelled=cancelled, completion_estimate=completion_estimate)
@@ -1,34 +1,70 @@
 # scripts/publish_scheduled.py
+# posts/*.md 중 publish_date 가 오늘인 글만 발행
+# - 날짜 인덱스(post_index.py)로 오늘 글만 찾음 → 전체 파일을 매번 열지 않음
+# - 본문(frontmatter.load)은 발행할 글만 읽음
+# - 발행 기록(publish_ledger.py)에 (파일, 날짜, 내용 해시) → post id 저장
+#   → 발행 직후 죽어서 인덱스에 표시 못 했어도 다시 돌릴 때 같은 글을 또 올리지 않음
+#   → 이미 올린 글이 수정됐으면(해시가 다름) 새 글 대신 그 post id 를 EditPost
 from datetime import datetime
-import os, glob, frontmatter
+import os, sys, frontmatter
 from wordpress_xmlrpc import Client, WordPressPost
 from wordpress_xmlrpc.methods import posts
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from post_index import PostIndex
+from publish_ledger import PublishLedger, PUBLISHED, content_hash
+import tracing
+
+POSTS_DIR = "posts"
+
+tracing.start_run("publish_scheduled")
+
 today = datetime.now().strftime("%Y-%m-%d")
 
-# 워드프레스 연결
-client = Client(
-    os.getenv("WORDPRESS_URL"),
-    os.getenv("WORDPRESS_USERNAME"),
-    os.getenv("WORDPRESS_PASSWORD")
-)
+# 인덱스 갱신 (새 파일 / 수정된 파일만 헤더 다시 읽음)
+index = PostIndex()
+ledger = PublishLedger()
+stats = index.refresh(POSTS_DIR)
+due = index.due(today)
+print(f"🗂️ 인덱스: 글 {stats['files']}개 / 해시 확인 {stats['hashed']}개 / 헤더 다시 읽음 {stats['reread']}개 / 삭제 {stats['removed']}개 → 오늘({today}) 발행 {len(due)}개")
 
-# posts 폴더 내 모든 마크다운 파일 검사
-for path in glob.glob("posts/*.md"):
+if due:
+    # 워드프레스 연결
+    client = Client(
+        os.getenv("WORDPRESS_URL"),
+        os.getenv("WORDPRESS_USERNAME"),
+        os.getenv("WORDPRESS_PASSWORD")
+    )
+
+for path, title in due:
     post = frontmatter.load(path)
-    publish_date = post.get("publish_date")
-    title = post.get("title", os.path.basename(path))
-    
-    if publish_date == today:
-        wp_post = WordPressPost()
-        wp_post.title = title
-        wp_post.content = post.content
-        wp_post.post_status = "publish"
-
-        try:
-            client.call(posts.NewPost(wp_post))
+    title = post.get("title", title)
+    hash_ = content_hash(post.content)
+
+    entry = ledger.get(path, today)
+    if entry and entry["step"] == PUBLISHED and entry["content_hash"] == hash_:
+        index.mark_published(path)
+        print(f"⏭️ Already published: {title} (🆔 {entry['post_id']})")
+        continue
+
+    wp_post = WordPressPost()
+    wp_post.title = title
+    wp_post.content = post.content
+    wp_post.post_status = "publish"
+
+    try:
+        if entry and entry["step"] == PUBLISHED and entry["post_id"]:
+            # 오늘 이미 올린 글이 수정됨 → 같은 글을 고침 (NewPost 하면 중복 글)
+            post_id = entry["post_id"]
+            with tracing.span("EditPost", path=path):
+                client.call(posts.EditPost(post_id, wp_post))
+            print(f"✏️ Updated: {title} (🆔 {post_id})")
+        else:
+            with tracing.span("NewPost", path=path):
+                post_id = client.call(posts.NewPost(wp_post))
             print(f"✅ Published: {title}")
-        except Exception as e:
-            print(f"❌ Failed to publish {title}: {e}")
-    else:
-        print(f"⏳ Skipped: {title} (publish_date={publish_date})")
+        ledger.record_published(path, today, post_id, entry["url"] if entry else None, hash_)
+        index.mark_published(path)
+    except Exception as e:
+        print(f"❌ Failed to publish {title}: {e}")
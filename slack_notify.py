@@ -0,0 +1,210 @@
+"""
+슬랙 알림 (Incoming Webhook)
+- send_slack() 등은 대기열에 넣고 바로 리턴 → 발행 흐름이 슬랙 응답을 기다리지 않음
+- 백그라운드 스레드 1개가 keep-alive 세션으로 전송 (실패하면 지수 백오프로 재시도, 429 는 Retry-After)
+- SLACK_BATCH_SECONDS 안에 들어온 글 예약 이벤트는 block-kit 메시지 1개로 묶음
+- 프로그램이 끝날 때(atexit) 남은 알림 전부 전송 (최대 SLACK_FLUSH_TIMEOUT 초)
+- requests 도 전송 스레드에서 처음 보낼 때 import
+"""
+import atexit
+import os
+import queue
+import random
+import threading
+import time
+
+import tracing
+
+SLACK_WEBHOOK_URL = os.environ.get('SLACK_WEBHOOK_URL')
+
+# 첫 알림 후 이만큼 더 모아서 한번에 전송
+SLACK_BATCH_SECONDS = float(os.environ.get('SLACK_BATCH_SECONDS', 2))
+SLACK_RETRIES = int(os.environ.get('SLACK_RETRIES', 3))
+SLACK_BACKOFF_SECONDS = 1.0
+SLACK_TIMEOUT = (3.05, 10)  # (connect, read)
+SLACK_FLUSH_TIMEOUT = float(os.environ.get('SLACK_FLUSH_TIMEOUT', 30))
+
+# block-kit 메시지 1개에 넣을 최대 글 수 (슬랙 제한: 블록 50개)
+POSTS_PER_MESSAGE = 20
+
+
+def _escape(text):
+    """슬랙 mrkdwn 에서 특수문자 (& < >)"""
+    return str(text).replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def _retry_after(response):
+    try:
+        return max(0.0, float(response.headers.get('Retry-After')))
+    except (TypeError, ValueError):
+        return None
+
+
+def posts_payload(results):
+    """예약 완료된 글 리스트 → block-kit 메시지 1개"""
+    blocks = [{
+        "type": "header",
+        "text": {"type": "plain_text", "text": f"🎉 한일 편의점 예약발행 완료! ({len(results)}개)"},
+    }]
+    for r in results:
+        flag = '🇯🇵' if r['country'] == 'jp' else '🇰🇷'
+        title = r['title'] if len(r['title']) <= 40 else r['title'][:40] + '...'
+        blocks.append({
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": f"{flag} *{_escape(r['store'])}*\n📝 <{r['url']}|{_escape(title)}>\n🕐 {r['when']}",
+            },
+        })
+    blocks.append({"type": "divider"})
+    blocks.append({
+        "type": "context",
+        "elements": [{"type": "mrkdwn", "text": "각 시간에 발행 알림을 다시 보내드릴게요! 📱"}],
+    })
+    text = f"🎉 한일 편의점 예약발행 완료! 총 {len(results)}개 글 예약: " + ", ".join(r['store'] for r in results)
+    return {"text": text, "blocks": blocks}
+
+
+class SlackNotifier:
+    def __init__(self, webhook_url, batch_seconds=SLACK_BATCH_SECONDS, retries=SLACK_RETRIES):
+        self.webhook_url = webhook_url
+        self.batch_seconds = batch_seconds
+        self.retries = retries
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.thread = None
+        self.session = None
+        self.stats = {'queued': 0, 'messages': 0, 'requests': 0, 'failed': 0}
+
+    # ---------- 보내는 쪽 (즉시 리턴) ----------
+    def _enqueue(self, kind, data):
+        if not self.webhook_url:
+            print("  ⚠️ SLACK_WEBHOOK_URL이 없어서 슬랙 전송 건너뜀")
+            return False
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name='slack-notifier', daemon=True)
+                self.thread.start()
+                atexit.register(self.flush)
+            self.stats['queued'] += 1
+        self.queue.put((kind, data))
+        return True
+
+    def text(self, message):
+        """일반 텍스트 메시지 1개"""
+        return self._enqueue('text', message)
+
+    def post(self, result):
+        """글 예약 이벤트 1개 (같은 배치의 글은 메시지 1개로 묶임)"""
+        return self._enqueue('post', result)
+
+    def flush(self, timeout=SLACK_FLUSH_TIMEOUT):
+        """대기열을 바로 비우고 전송 끝날 때까지 대기 (시간 초과면 False)"""
+        if self.thread is None:
+            return True
+        done = threading.Event()
+        self.queue.put(('flush', done))
+        if not done.wait(timeout):
+            print(f"  ⚠️ 슬랙 전송이 {timeout:.0f}초 안에 안 끝남 → 남은 알림 포기")
+            return False
+        return True
+
+    # ---------- 전송 스레드 ----------
+    def _collect(self):
+        """첫 이벤트 후 batch_seconds 동안 (flush 요청이 오면 바로) 모은 이벤트들"""
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + self.batch_seconds
+        while batch[-1][0] != 'flush':
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            texts = [data for kind, data in batch if kind == 'text']
+            posts = [data for kind, data in batch if kind == 'post']
+            for message in texts:
+                self._send({'text': message}, "메시지")
+            for start in range(0, len(posts), POSTS_PER_MESSAGE):
+                chunk = posts[start:start + POSTS_PER_MESSAGE]
+                self._send(posts_payload(chunk), f"예약 글 {len(chunk)}개 묶음")
+            for kind, data in batch:
+                if kind == 'flush':
+                    data.set()
+
+    def _session(self):
+        if self.session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            self.session = requests.Session()
+            self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        return self.session
+
+    @tracing.traced('send_slack')
+    def _send(self, payload, label):
+        """재시도 포함 전송 (전송 스레드에서만 호출, 예외는 밖으로 안 냄)"""
+        tracing.annotate(label=label)
+        error = None
+        for attempt in range(self.retries + 1):
+            delay = None
+            try:
+                self.stats['requests'] += 1
+                response = self._session().post(self.webhook_url, json=payload, timeout=SLACK_TIMEOUT)
+                if response.status_code == 200:
+                    self.stats['messages'] += 1
+                    print(f"  📨 슬랙 전송 완료 ({label})")
+                    return True
+                error = f"HTTP {response.status_code}"
+                if response.status_code != 429 and response.status_code < 500:
+                    break
+                delay = _retry_after(response)
+            except Exception as e:
+                error = type(e).__name__
+
+            if attempt < self.retries:
+                time.sleep(delay if delay is not None else SLACK_BACKOFF_SECONDS * 2 ** attempt * random.uniform(0.5, 1.5))
+
+        self.stats['failed'] += 1
+        tracing.annotate(error=error)
+        print(f"  ❌ 슬랙 전송 실패 ({label}): {error}")
+        return False
+
+
+NOTIFIER = SlackNotifier(SLACK_WEBHOOK_URL)
+
+
+def send_slack(message):
+    """대기열에 넣고 바로 리턴 (웹훅이 없으면 False)"""
+    return NOTIFIER.text(message)
+
+
+def send_generation_complete_slack(results):
+    """예약 완료된 글들 → 글마다 이벤트 (전송 스레드가 block-kit 메시지 1개로 묶음)"""
+    for r in results:
+        NOTIFIER.post(r)
+
+
+def send_publish_notification(hour, store_name):
+    time_map = {
+        9: "아침 9시",
+        12: "점심 12시",
+        18: "저녁 6시"
+    }
+
+    time_str = time_map.get(hour, f"{hour}시")
+
+    message = f"""🔔 {time_str} 글 발행 완료!
+
+{store_name} 글이 방금 발행되었습니다! 🎉
+
+📱 인스타에 올릴 시간이에요!
+"""
+
+    send_slack(message)
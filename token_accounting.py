@@ -0,0 +1,212 @@
+"""
+AI 토큰 회계
+- 호출 전: 프롬프트 토큰 추정 + 실행 예산(TOKEN_BUDGET) 확인 → 넘으면 BudgetExceeded
+- 호출 후: 프로바이더가 알려준 실제 사용량(Gemini usageMetadata / OpenAI·Groq usage) 기록
+- 실행 끝: 편의점 x 프로바이더별 토큰 / 지연시간 / 비용 리포트 (화면 + JSON)
+
+편의점 이름은 호출 스레드에 붙여둠:
+    with token_accounting.store('GS25'):
+        generate_with_auto(prompt)
+"""
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from config import TOKEN_BUDGET, TOKEN_PRICES, TOKEN_REPORT_DIR
+
+_context = threading.local()
+
+_GEMINI_MODEL = re.compile(r'/models/([^:/?]+)')
+
+
+class BudgetExceeded(Exception):
+    """이번 실행의 토큰 예산 초과"""
+
+
+def estimate_tokens(text):
+    """대충 토큰 수 추정 (영문 4자당 1토큰, 한글/일본어는 1자당 1토큰)"""
+    if not text:
+        return 0
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return ascii_chars // 4 + (len(text) - ascii_chars) + 1
+
+
+def usage_from_json(data):
+    """응답 JSON (스트리밍이면 이벤트 1개) → {'prompt', 'completion', 'total'} / 없으면 None"""
+    if not isinstance(data, dict):
+        return None
+    if data.get('usageMetadata'):
+        meta = data['usageMetadata']
+        return {
+            'prompt': meta.get('promptTokenCount', 0),
+            'completion': meta.get('candidatesTokenCount', 0),
+            'total': meta.get('totalTokenCount', 0),
+        }
+    # Groq 스트리밍은 x_groq.usage 에 들어옴
+    usage = data.get('usage') or (data.get('x_groq') or {}).get('usage')
+    if usage:
+        return {
+            'prompt': usage.get('prompt_tokens', 0),
+            'completion': usage.get('completion_tokens', 0),
+            'total': usage.get('total_tokens', 0),
+        }
+    return None
+
+
+def model_from_request(url, payload):
+    """요청 JSON 의 model (OpenAI·Groq) 또는 URL 의 /models/xxx: (Gemini)"""
+    if isinstance(payload, dict) and payload.get('model'):
+        return payload['model']
+    match = _GEMINI_MODEL.search(url or '')
+    return match.group(1) if match else 'unknown'
+
+
+def cost_usd(model, prompt_tokens, completion_tokens):
+    price = TOKEN_PRICES.get(model)
+    if not price:
+        return 0.0
+    return (prompt_tokens * price['input'] + completion_tokens * price['output']) / 1_000_000
+
+
+@contextmanager
+def store(name):
+    """이 블록 안에서 나가는 AI 호출을 name 편의점 몫으로 기록"""
+    previous = getattr(_context, 'store', None)
+    _context.store = name
+    try:
+        yield
+    finally:
+        _context.store = previous
+
+
+def current_store():
+    return getattr(_context, 'store', None) or '-'
+
+
+class TokenLedger:
+    def __init__(self, budget=TOKEN_BUDGET):
+        self.budget = budget
+        self.lock = threading.Lock()
+        self.used = 0        # 실제 사용량 (모르면 추정치)
+        self.reserved = 0    # 진행 중인 호출이 잡아둔 양
+        self.calls = []
+        self.started_at = datetime.now()
+
+    def exhausted(self):
+        with self.lock:
+            return bool(self.budget) and self.used >= self.budget
+
+    def reserve(self, tokens):
+        """호출 전 예산 확인 + 예약 (넘으면 BudgetExceeded)"""
+        with self.lock:
+            if self.budget and self.used + self.reserved + tokens > self.budget:
+                raise BudgetExceeded(
+                    f"토큰 예산 초과: 사용 {self.used} + 진행 중 {self.reserved} + 이번 {tokens} > {self.budget}"
+                )
+            self.reserved += tokens
+
+    def record(self, provider, model, reserved, prompt_estimate, usage, latency, ok=True,
+               cancelled=False, completion_estimate=0):
+        """
+        호출 1번 기록 + 예약 해제
+        usage 가 없으면 (에러 / 사용량 안 알려줌) 프롬프트 추정치만 사용한 걸로 침
+        cancelled: 중간에 끊은 스트리밍 (헤지에서 짐) → 받은 만큼(completion_estimate)까지 사용량으로 침
+        """
+        if usage:
+            prompt_tokens, completion_tokens = usage['prompt'], usage['completion']
+            total = usage['total'] or prompt_tokens + completion_tokens
+        else:
+            prompt_tokens, completion_tokens = prompt_estimate, completion_estimate
+            total = prompt_estimate + completion_estimate if ok or cancelled else 0
+
+        entry = {
+            'store': current_store(),
+            'provider': provider,
+            'model': model,
+            'ok': ok,
+            'cancelled': cancelled,
+            'estimated_prompt': prompt_estimate,
+            'prompt': prompt_tokens,
+            'completion': completion_tokens,
+            'total': total,
+            'measured': bool(usage),
+            'latency': round(latency, 3),
+            'cost_usd': cost_usd(model, prompt_tokens, completion_tokens),
+            'at': time.time(),
+        }
+        with self.lock:
+            self.reserved = max(0, self.reserved - reserved)
+            self.used += total
+            self.calls.append(entry)
+        return entry
+
+    def release(self, reserved):
+        """요청을 못 보냈을 때 예약만 해제"""
+        with self.lock:
+            self.reserved = max(0, self.reserved - reserved)
+
+    def report(self):
+        """편의점 x 프로바이더별 합계 (토큰 많이 쓴 순)"""
+        with self.lock:
+            calls = list(self.calls)
+            used = self.used
+
+        groups = {}
+        for c in calls:
+            g = groups.setdefault((c['store'], c['provider']), {
+                'store': c['store'], 'provider': c['provider'], 'model': c['model'],
+                'calls': 0, 'failed': 0, 'cancelled': 0, 'estimated_prompt': 0, 'prompt': 0, 'completion': 0,
+                'total': 0, 'latency': 0.0, 'cost_usd': 0.0,
+            })
+            g['calls'] += 1
+            g['failed'] += 0 if c['ok'] or c['cancelled'] else 1
+            g['cancelled'] += 1 if c['cancelled'] else 0
+            for key in ('estimated_prompt', 'prompt', 'completion', 'total', 'latency', 'cost_usd'):
+                g[key] += c[key]
+
+        rows = sorted(groups.values(), key=lambda g: g['total'], reverse=True)
+        return {
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'budget': self.budget,
+            'used': used,
+            'cost_usd': sum(r['cost_usd'] for r in rows),
+            'rows': rows,
+            'calls': calls,
+        }
+
+    def print_report(self):
+        report = self.report()
+        if not report['rows']:
+            return report
+        budget = f" / 예산 {report['budget']:,}" if report['budget'] else ""
+        print(f"🧮 토큰 사용량: {report['used']:,}{budget} (약 ${report['cost_usd']:.4f})")
+        for r in report['rows']:
+            cancelled = f", 취소 {r['cancelled']}" if r['cancelled'] else ""
+            print(f"   - {r['store']} / {r['provider']}: 호출 {r['calls']} (실패 {r['failed']}{cancelled}) / "
+                  f"입력 {r['prompt']:,} (추정 {r['estimated_prompt']:,}) / 출력 {r['completion']:,} / "
+                  f"{r['latency']:.1f}s / ${r['cost_usd']:.4f}")
+        return report
+
+    def write_report(self, name='run', report_dir=TOKEN_REPORT_DIR):
+        """리포트 JSON 저장 → 경로 (호출이 없었으면 None)"""
+        report = self.report()
+        if not report['calls']:
+            return None
+        try:
+            os.makedirs(report_dir, exist_ok=True)
+            path = os.path.join(report_dir, f"tokens_{name}_{self.started_at.strftime('%Y%m%d_%H%M%S')}.json")
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            print(f"📄 토큰 리포트: {path}")
+            return path
+        except Exception as e:
+            print(f"⚠️ 토큰 리포트 저장 실패: {e}")
+            return None
+
+
+# 프로세스 전체에서 공유 (실행 1번 = 프로세스 1개)
+LEDGER = TokenLedger()
@@ -0,0 +1,237 @@
+"""
+실행 구간별 시간 측정 (가벼운 트레이싱)
+- with tracing.span('이름', 속성=값): ... / @tracing.traced() 로 감싸면 구간 1개 (monotonic 시계)
+- 같은 스레드 안에서는 자동으로 부모-자식, 스레드 풀로 넘길 때는 tracing.bind(func) 로 부모 전달
+- 실행 끝: 경로별(부모 → 자식) 합계를 플레임 그래프처럼 출력 + JSON Lines 파일 저장
+  (필드 이름은 OpenTelemetry span 과 같게: traceId / spanId / parentSpanId / startTimeUnixNano ...)
+
+    tracing.start_run('generate')   # main() 맨 앞에서 1번 → 종료 시 요약 출력 + 파일 저장
+    with tracing.span('crawl_page', store='GS25'):
+        ...
+"""
+import atexit
+import functools
+import json
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from config import TRACE_DIR
+
+_local = threading.local()
+
+# 요약에 보여줄 최대 줄 수 / 막대 길이
+SUMMARY_ROWS = 40
+BAR_WIDTH = 24
+
+
+class Span:
+    __slots__ = ('name', 'span_id', 'parent', 'attrs', 'start', 'end', 'error', 'thread')
+
+    def __init__(self, name, parent, attrs):
+        self.name = name
+        self.span_id = secrets.token_hex(8)
+        self.parent = parent
+        self.attrs = attrs
+        self.start = time.monotonic_ns()
+        self.end = None
+        self.error = None
+        self.thread = threading.current_thread().name
+
+    def failure(self):
+        """예외로 끝났거나 annotate(error=...) 로 실패 표시한 경우 그 메시지 (아니면 None)"""
+        return self.error or self.attrs.get('error')
+
+    def path(self):
+        """루트부터 이 구간까지 이름 튜플"""
+        names = []
+        span = self
+        while span is not None:
+            names.append(span.name)
+            span = span.parent
+        return tuple(reversed(names))
+
+
+class Tracer:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.spans = []
+        self.trace_id = secrets.token_hex(16)
+        self.run_name = None
+        self.started_at = datetime.now()
+        # monotonic → 벽시계 변환용 기준점
+        self.wall_ns = time.time_ns()
+        self.mono_ns = time.monotonic_ns()
+
+    def add(self, span):
+        with self.lock:
+            self.spans.append(span)
+
+    def _unix_ns(self, mono_ns):
+        return self.wall_ns + (mono_ns - self.mono_ns)
+
+    def records(self):
+        """끝난 구간들 → OpenTelemetry span 모양 dict 리스트 (시작 순)"""
+        with self.lock:
+            spans = sorted((s for s in self.spans if s.end is not None), key=lambda s: s.start)
+        records = []
+        for s in spans:
+            error = s.failure()
+            records.append({
+                'traceId': self.trace_id,
+                'spanId': s.span_id,
+                'parentSpanId': s.parent.span_id if s.parent else None,
+                'name': s.name,
+                'startTimeUnixNano': self._unix_ns(s.start),
+                'endTimeUnixNano': self._unix_ns(s.end),
+                'durationMs': round((s.end - s.start) / 1e6, 3),
+                'attributes': {'thread': s.thread, **s.attrs},
+                'status': {'code': 'ERROR', 'message': error} if error else {'code': 'OK'},
+            })
+        return records
+
+    def summary(self):
+        """경로별 합계 → [(경로 튜플, 횟수, 합계 ms, 오류 수)] (부모 바로 밑에 자식, 큰 것부터)"""
+        totals = {}
+        with self.lock:
+            spans = [s for s in self.spans if s.end is not None]
+        for s in spans:
+            row = totals.setdefault(s.path(), [0, 0.0, 0])
+            row[0] += 1
+            row[1] += (s.end - s.start) / 1e6
+            row[2] += 1 if s.failure() else 0
+
+        children = {}
+        for path in totals:
+            children.setdefault(path[:-1], []).append(path)
+
+        ordered = []
+
+        def walk(parent):
+            for path in sorted(children.get(parent, []), key=lambda p: -totals[p][1]):
+                ordered.append((path, *totals[path]))
+                walk(path)
+
+        walk(())
+        return ordered
+
+    def print_summary(self):
+        rows = self.summary()
+        if not rows:
+            return
+        wall_ms = (time.monotonic_ns() - self.mono_ns) / 1e6
+        widest = max(total for _, _, total, _ in rows) or 1.0
+
+        print(f"\n🔥 구간별 시간 (실행 전체 {wall_ms / 1000:.2f}초, 병렬 구간은 합계라 더 클 수 있음)")
+        for path, count, total, errors in rows[:SUMMARY_ROWS]:
+            label = "  " * (len(path) - 1) + path[-1]
+            bar = '█' * max(1, round(BAR_WIDTH * total / widest))
+            error = f"  ❌{errors}" if errors else ""
+            print(f"   {label:<36} {count:>4}회 {total / 1000:>8.2f}초  {bar}{error}")
+        if len(rows) > SUMMARY_ROWS:
+            print(f"   ... {len(rows) - SUMMARY_ROWS}줄 생략")
+
+    def write(self, name=None, trace_dir=TRACE_DIR):
+        """JSON Lines 저장 (구간 1개 = 1줄) → 경로 (구간이 없으면 None)"""
+        records = self.records()
+        if not records:
+            return None
+        name = name or self.run_name or 'run'
+        try:
+            os.makedirs(trace_dir, exist_ok=True)
+            path = os.path.join(trace_dir, f"{name}_{self.started_at.strftime('%Y%m%d_%H%M%S')}.jsonl")
+            with open(path, 'w', encoding='utf-8') as f:
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            print(f"📄 구간별 시간 기록: {path}")
+            return path
+        except Exception as e:
+            print(f"⚠️ 구간별 시간 저장 실패: {e}")
+            return None
+
+    def finish(self):
+        self.print_summary()
+        self.write()
+
+
+# 프로세스 전체에서 공유 (실행 1번 = 프로세스 1개)
+TRACER = Tracer()
+
+
+def start_run(name):
+    """
+    이번 실행 이름 지정 + 종료 시(atexit) 요약 출력 / 파일 저장
+    atexit 는 나중에 등록한 것부터 실행 → 슬랙 전송 등 종료 때 도는 작업보다 먼저 불러야 그것까지 기록됨
+    """
+    if TRACER.run_name is None:
+        atexit.register(TRACER.finish)
+    TRACER.run_name = name
+
+
+def _stack():
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def current():
+    """이 스레드의 지금 구간 (없으면 None)"""
+    stack = _stack()
+    return stack[-1] if stack else None
+
+
+@contextmanager
+def span(name, **attrs):
+    """구간 1개 측정 (예외가 나면 오류로 기록하고 그대로 다시 던짐)"""
+    stack = _stack()
+    current_span = Span(name, stack[-1] if stack else None, attrs)
+    stack.append(current_span)
+    try:
+        yield current_span
+    except BaseException as e:
+        current_span.error = f"{type(e).__name__}: {str(e)[:200]}"
+        raise
+    finally:
+        current_span.end = time.monotonic_ns()
+        stack.pop()
+        TRACER.add(current_span)
+
+
+def annotate(**attrs):
+    """지금 구간에 속성 추가 (구간 밖이면 무시)"""
+    current_span = current()
+    if current_span is not None:
+        current_span.attrs.update(attrs)
+
+
+def traced(name=None):
+    """함수 전체를 구간 1개로 (이름 생략하면 함수 이름)"""
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def bind(func):
+    """다른 스레드에서 실행할 함수 → 지금 구간을 부모로 이어받는 함수"""
+    parent = current()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        stack = _stack()
+        saved = list(stack)
+        stack[:] = [parent] if parent is not None else []
+        try:
+            return func(*args, **kwargs)
+        finally:
+            stack[:] = saved
+    return wrapper
@@ -0,0 +1,44 @@
+"""
+워드프레스 발행 (WordPressPublisher 1개를 실행 전체에서 같이 씀)
+- wordpress_xmlrpc 는 발행기를 처음 만들 때 import
+"""
+import os
+
+WORDPRESS_URL = os.environ.get('WORDPRESS_URL')
+WORDPRESS_USERNAME = os.environ.get('WORDPRESS_USERNAME')
+WORDPRESS_PASSWORD = os.environ.get('WORDPRESS_PASSWORD')
+
+_publisher = None
+
+
+def wordpress_configured():
+    return bool(WORDPRESS_URL and WORDPRESS_USERNAME and WORDPRESS_PASSWORD)
+
+
+def get_publisher():
+    """실행 전체에서 워드프레스 Client 1개만 사용"""
+    global _publisher
+    if _publisher is None:
+        from wp_publisher import WordPressPublisher
+        _publisher = WordPressPublisher(WORDPRESS_URL, WORDPRESS_USERNAME, WORDPRESS_PASSWORD)
+    return _publisher
+
+
+def publish_to_wordpress(title, content, tags, category, scheduled_dt_kst):
+    """글 1개 바로 예약발행 (Couchmallow 이미지 자동 첨부)"""
+    if not wordpress_configured():
+        print("  ⚠️ 워드프레스 정보가 없어서 발행 건너뜀")
+        return {'success': False, 'error': '워드프레스 정보 없음'}
+    
+    try:
+        from wp_images import attach_couchmallow_image
+        
+        publisher = get_publisher()
+        content = attach_couchmallow_image(publisher, content)
+        return publisher.publish_now(title, content, tags, category, scheduled_dt_kst)
+        
+    except Exception as e:
+        print(f"  ❌ 발행 실패: {e}")
+        import traceback
+        traceback.print_exc()
+        return {'success': False, 'error': str(e)}
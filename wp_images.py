@@ -0,0 +1,77 @@
+"""
+워드프레스 발행 시 Couchmallow 이미지 자동 첨부
+- 이미지 뽑기/워터마크는 couchmallow.py
+- assets/ 안에 있는 이미지 → 워터마크 → 워드프레스에 업로드 → 본문 맨 위에 <img> 넣기
+- 이미지 업로드가 실패하면 그냥 글만 올림.
+- 업로드는 발행기(WordPressPublisher)의 Client 를 같이 씀.
+- PIL 을 읽기 때문에 이미지가 필요할 때만 import
+"""
+import os
+
+import image_optimizer
+import tracing
+from couchmallow import get_couchmallow_image_for_post
+from wp_publisher import WordPressPublisher
+
+
+def _upload_image_to_wp(publisher: WordPressPublisher, image_path: str) -> dict | None:
+    """로컬 이미지를 워드프레스에 media로 올리고 결과 dict를 리턴"""
+    ext = os.path.splitext(image_path)[1].lstrip('.').lower()
+    mime_type = image_optimizer.MIME_TYPES.get(ext, 'image/png')
+    with tracing.span('_upload_image_to_wp', file=os.path.basename(image_path)):
+        return publisher.upload_image(image_path, os.path.basename(image_path), mime_type)
+
+
+# 스타일은 심플하게, 공주님 톤 맞춰서 여백 조금
+COUCHMALLOW_IMG_STYLE = "max-width:360px;width:100%;height:auto;border-radius:18px;margin-bottom:24px;"
+
+
+@tracing.traced()
+def prepare_couchmallow_image(publisher: WordPressPublisher) -> str:
+    """
+    1) 쿠치멜로 이미지 뽑기
+    2) 워터마크 → 웹용 최적화 (360px 1x/2x WebP + PNG 대체)
+    3) 변환본을 WP에 업로드 (이미 올린 건 재사용)
+    4) 성공하면 본문 맨 위에 붙일 <picture> 한 줄 리턴 (실패하면 빈 문자열)
+    본문이 필요 없어서 AI 생성이 끝나기 전에 미리 돌려도 됨
+    """
+    try:
+        img_path = get_couchmallow_image_for_post()
+        if not img_path:
+            return ""
+        
+        optimized = image_optimizer.optimize_for_web(img_path)
+        if optimized:
+            urls = {}
+            for variant in optimized['variants']:
+                res = _upload_image_to_wp(publisher, variant['path'])
+                if res and 'url' in res:
+                    urls[variant['path']] = res['url']
+            
+            picture = image_optimizer.picture_html(urls, optimized, "Couchmallow", COUCHMALLOW_IMG_STYLE)
+            if picture:
+                report = image_optimizer.bytes_report(optimized)
+                print(f"  🖼️ Couchmallow 이미지 첨부: {report['original_bytes'] // 1024}KB → "
+                      f"{report['served_bytes'] // 1024}KB ({report['saved_pct']:.0f}% 절감)")
+                return f'<p>{picture}</p>\n'
+            
+            print("  ⚠️ 최적화 이미지 업로드 실패 → 원본으로 시도")
+        
+        img_res = _upload_image_to_wp(publisher, img_path)
+        if img_res and 'url' in img_res:
+            img_url = img_res['url']
+            print(f"  🖼️ Couchmallow 이미지 업로드 성공: {img_url}")
+            
+            return f'<p><img src="{img_url}" alt="Couchmallow" style="{COUCHMALLOW_IMG_STYLE}"></p>\n'
+        
+        print("  ⚠️ 이미지 업로드 결과에 url이 없어서 이미지 없이 발행합니다.")
+        
+    except Exception as e:
+        print(f"  ⚠️ 이미지 업로드 과정에서 에러. 이미지 없이 발행할게요: {e}")
+    
+    return ""
+
+
+def attach_couchmallow_image(publisher: WordPressPublisher, content: str) -> str:
+    """쿠치멜로 이미지를 올리고 본문 맨 위에 붙여서 리턴 (실패하면 글만)"""
+    return prepare_couchmallow_image(publisher) + content
@@ -0,0 +1,230 @@
+"""
+워드프레스 XML-RPC 발행기
+- 실행 1번에 Client 1개 (TLS 핸드셰이크 / 메서드 목록 조회 1번만, 커넥션 keep-alive 재사용)
+- 이미지 업로드는 바로, 예약 글(NewPost)은 모아뒀다가 system.multicall 한 번에
+- 결과는 글마다 따로 리턴
+- 이미지는 내용 해시로 기록해서 같은 파일은 다시 안 올림 (media_manifest)
+"""
+import os
+import threading
+from datetime import timezone
+
+from wordpress_xmlrpc import Client, WordPressPost
+from wordpress_xmlrpc.compat import xmlrpc_client
+from wordpress_xmlrpc.methods import media
+from wordpress_xmlrpc.methods.posts import GetPosts, NewPost
+
+from media_manifest import MediaManifest, file_sha256
+import tracing
+
+# 업로드 파일 이름에 붙이는 해시 길이 (기록이 없을 때 원격 라이브러리에서 찾는 용도)
+NAME_HASH_LENGTH = 12
+
+# 원격 라이브러리 검색 시 최근 몇 개까지 볼지
+LIBRARY_SCAN_LIMIT = 200
+
+# 이미 올라간 예약 글 찾을 때 최근 몇 개까지 볼지
+POST_SCAN_LIMIT = 50
+
+
+class WordPressPublisher:
+    def __init__(self, url, username, password, manifest=None):
+        self.url = url
+        self.username = username
+        self.password = password
+        self.manifest = manifest if manifest is not None else MediaManifest()
+        self._client = None
+        self.queue = []  # (key, NewPost, scheduled_dt_kst)
+        self._verified = set()  # 이번 실행에서 원격 존재 확인한 media id
+        self._upload_lock = threading.Lock()
+
+    @property
+    def client(self):
+        """처음 쓸 때 1번만 연결"""
+        if self._client is None:
+            print(f"  🔗 워드프레스 연결: {self.url}")
+            self._client = Client(f"{self.url}/xmlrpc.php", self.username, self.password)
+        return self._client
+
+    def upload_image(self, image_path, name, mime_type='image/png'):
+        """
+        로컬 이미지를 media 로 업로드 (실패 시 None)
+        1) 기록에 같은 해시가 있고 원격에도 있으면 → 업로드 없이 재사용
+        2) 기록이 없으면 원격 라이브러리에서 해시 붙은 파일 이름으로 찾아봄
+        3) 그래도 없으면 업로드 후 기록
+        """
+        try:
+            content_hash = file_sha256(image_path)
+            stem, ext = os.path.splitext(name)
+            upload_name = f"{stem}_{content_hash[:NAME_HASH_LENGTH]}{ext}"
+            
+            # 같은 이미지를 여러 글이 동시에 올리지 않도록
+            with self._upload_lock:
+                cached = self._lookup_media(content_hash, upload_name)
+                if cached:
+                    print(f"  ♻️ 이미 올린 이미지 재사용 (media {cached['id']}, 0 bytes 전송)")
+                    return cached
+                
+                with open(image_path, 'rb') as img:
+                    data = {
+                        'name': upload_name,
+                        'type': mime_type,
+                        'bits': xmlrpc_client.Binary(img.read()),
+                    }
+                # 예시: {'id': 123, 'file': '...', 'url': 'https://...png', 'type': 'image/png'}
+                res = self.client.call(media.UploadFile(data))
+                if res and 'url' in res:
+                    self.manifest.record(content_hash, res['id'], res['url'], upload_name)
+                    self._verified.add(str(res['id']))
+                return res
+        except Exception as e:
+            print(f"  ⚠️ 워드프레스 이미지 업로드 실패: {e}")
+            return None
+
+    def _lookup_media(self, content_hash, upload_name):
+        """기록 → 원격 확인 순서로 이미 올라간 media 찾기"""
+        entry = self.manifest.lookup(content_hash)
+        if entry:
+            if str(entry['id']) in self._verified:
+                return {'id': entry['id'], 'url': entry['url'], 'cached': True}
+            try:
+                # 실행마다 1번은 원격에 아직 있는지 확인 (라이브러리에서 지웠을 수도 있음)
+                item = self.client.call(media.GetMediaItem(entry['id']))
+                self._verified.add(str(entry['id']))
+                return {'id': entry['id'], 'url': item.link or entry['url'], 'cached': True}
+            except Exception:
+                print(f"  ⚠️ 기록된 media {entry['id']} 가 원격에 없음 → 다시 업로드")
+                self.manifest.forget(content_hash)
+                return None
+        
+        # 기록이 없으면 (캐시 유실 등) 원격 라이브러리에서 같은 이름 찾기
+        try:
+            stem = os.path.splitext(upload_name)[0]
+            library = self.client.call(media.GetMediaLibrary({'number': LIBRARY_SCAN_LIMIT}))
+            for item in library:
+                if item.link and stem in item.link:
+                    self.manifest.record(content_hash, item.id, item.link, upload_name)
+                    self._verified.add(str(item.id))
+                    return {'id': item.id, 'url': item.link, 'cached': True}
+        except Exception as e:
+            print(f"  ⚠️ 원격 미디어 라이브러리 조회 실패: {e}")
+        return None
+
+    def _build_post(self, title, content, tags, category, scheduled_dt_kst):
+        post = WordPressPost()
+        post.title = title
+        post.content = content
+        post.terms_names = {'post_tag': tags, 'category': [category]}
+
+        dt_utc = scheduled_dt_kst.astimezone(timezone.utc)
+        post.post_status = 'future'
+        post.date = dt_utc.replace(tzinfo=None)
+        post.date_gmt = dt_utc.replace(tzinfo=None)
+        return post
+
+    def _result(self, post_id, scheduled_dt_kst):
+        url = f"{self.url}/?p={post_id}"
+        return {'success': True, 'url': url, 'post_id': post_id, 'hour': scheduled_dt_kst.hour}
+
+    def find_post(self, title, scheduled_dt_kst):
+        """
+        같은 제목 + 같은 예약 시각으로 이미 올라간 글 → 결과 dict (없으면 None)
+        조회 자체가 실패하면 예외 그대로 (모르는 채로 다시 올리면 중복)
+        """
+        dt_utc = scheduled_dt_kst.astimezone(timezone.utc).replace(tzinfo=None)
+        recent = self.client.call(GetPosts({
+            'number': POST_SCAN_LIMIT,
+            'post_status': ['future', 'publish'],
+            'orderby': 'date',
+            'order': 'DESC',
+        }))
+        for post in recent:
+            if post.title == title and post.date == dt_utc:
+                return self._result(post.id, scheduled_dt_kst)
+        return None
+
+    def publish_now(self, title, content, tags, category, scheduled_dt_kst):
+        """글 1개 바로 예약발행"""
+        try:
+            print(f"  📤 발행 준비: {title[:30]}...")
+            print(f"  📅 예약 시간: {scheduled_dt_kst.strftime('%Y-%m-%d %H:%M')} (KST)")
+
+            post = self._build_post(title, content, tags, category, scheduled_dt_kst)
+            with tracing.span('NewPost'):
+                post_id = self.client.call(NewPost(post))
+            result = self._result(post_id, scheduled_dt_kst)
+
+            print(f"  ✅ 예약발행 성공! 🆔 {post_id} 🔗 {result['url']}")
+            return result
+
+        except Exception as e:
+            print(f"  ❌ 발행 실패: {e}")
+            return {'success': False, 'error': str(e)}
+
+    def queue_post(self, key, title, content, tags, category, scheduled_dt_kst):
+        """flush() 때 한 번에 보낼 예약 글 추가"""
+        post = self._build_post(title, content, tags, category, scheduled_dt_kst)
+        self.queue.append((key, NewPost(post), scheduled_dt_kst))
+        print(f"  📥 발행 대기열 추가: {title[:30]}... ({scheduled_dt_kst.strftime('%Y-%m-%d %H:%M')} KST)")
+
+    def flush(self, on_result=None):
+        """
+        대기열의 NewPost 를 system.multicall 1번으로 전송
+        - {key: 결과 dict} 리턴 (글마다 성공/실패 따로)
+        - on_result(key, 결과 dict): 글마다 결과가 나오는 즉시 호출 (발행 기록용)
+        - 서버가 multicall 을 거부(Fault: 메서드 없음 등)했을 때만 1개씩 보냄
+        - 연결 끊김 / 타임아웃은 서버가 이미 글을 만들었을 수도 있어서 다시 안 보내고 전부 실패 처리
+          (발행 기록이 publishing 으로 남음 → 다음 실행에서 워드프레스 확인 후 진행)
+        """
+        queue, self.queue = self.queue, []
+        if not queue:
+            return {}
+
+        print(f"  📤 예약 글 {len(queue)}개 system.multicall 전송...")
+
+        try:
+            client = self.client
+            multicall = xmlrpc_client.MultiCall(client.server)
+            for _, method, _ in queue:
+                getattr(multicall, method.method_name)(*method.get_args(client))
+            with tracing.span('NewPost', posts=len(queue), multicall=True):
+                raw_results = multicall()
+        except xmlrpc_client.Fault as e:
+            print(f"  ⚠️ 서버가 multicall 거부, 1개씩 발행합니다: {e}")
+            return self._flush_one_by_one(queue, on_result)
+        except Exception as e:
+            print(f"  ❌ multicall 전송 실패 (올라갔는지 알 수 없음 → 다시 안 보냄): {e}")
+            results = {}
+            for key, _, _ in queue:
+                results[key] = {'success': False, 'error': str(e)}
+                if on_result:
+                    on_result(key, results[key])
+            return results
+
+        results = {}
+        for index, (key, method, scheduled_dt_kst) in enumerate(queue):
+            try:
+                post_id = method.process_result(raw_results[index])
+                results[key] = self._result(post_id, scheduled_dt_kst)
+                print(f"  ✅ [{key}] 예약발행 성공! 🆔 {post_id}")
+            except Exception as e:
+                print(f"  ❌ [{key}] 발행 실패: {e}")
+                results[key] = {'success': False, 'error': str(e)}
+            if on_result:
+                on_result(key, results[key])
+        return results
+
+    def _flush_one_by_one(self, queue, on_result=None):
+        results = {}
+        for key, method, scheduled_dt_kst in queue:
+            try:
+                with tracing.span('NewPost', key=key):
+                    post_id = self.client.call(method)
+                results[key] = self._result(post_id, scheduled_dt_kst)
+                print(f"  ✅ [{key}] 예약발행 성공! 🆔 {post_id}")
+            except Exception as e:
+                print(f"  ❌ [{key}] 발행 실패: {e}")
+                results[key] = {'success': False, 'error': str(e)}
+            if on_result:
+                on_result(key, results[key])
+        return results